@@ -24,8 +24,11 @@
     'data': [
         'security/ir.model.access.csv',
         'data/ordertech_configration.xml',
+        'data/ordertech_cron.xml',
         'data/ordertech_product_attributes.xml',
         'views/ordertech_configration_view.xml',
+        'views/ordertech_sync_job_view.xml',
+        'views/ordertech_trace_view.xml',
         'views/res_company_view.xml',
         'views/ordertech_restaurant_view.xml',
         'views/ordertech_branch_view.xml',
@@ -41,11 +44,6 @@
         'views/ordertech_order_view.xml',
 
     ],
-    'assets': {
-        'point_of_sale._assets_pos': [
-            'ordertech_integration/static/src/**/*',
-        ],
-    },
     'post_init_hook': 'post_init_generate_api_key',
     'installable': True,
     'application': True,
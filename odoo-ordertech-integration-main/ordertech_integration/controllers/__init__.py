@@ -2,3 +2,4 @@ from . import general_functions
 from . import permanent_token
 from . import res_partner
 from . import pos_order
+from . import metrics
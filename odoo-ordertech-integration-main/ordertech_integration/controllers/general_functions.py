@@ -30,17 +30,16 @@ def invalid_response(error,status=400):
 def zero_pad(num, size):
     return str(num).zfill(size)
 
-def generate_unique_id(session):
+def generate_unique_id(session_id, user_id, config):
     # session.id → 5 digits
-    part1 = zero_pad(session.id, 5)
+    part1 = zero_pad(session_id, 5)
 
     # odoo.login_number → 3 digits
-    login_number = session.user_id.id or 0
+    login_number = user_id or 0
     part2 = zero_pad(int(login_number), 3)
 
     # getNextSequenceNumber() → 4 digits
-    last_order = session.order_ids.sorted('sequence_number')[-1:]  # last order
-    next_seq = (last_order.sequence_number if last_order else 0) + 1
+    next_seq = config._ordertech_next_sequence_number()
     part3 = zero_pad(next_seq, 4)
 
     return f"{part1}-{part2}-{part3}"
@@ -0,0 +1,19 @@
+from odoo import http
+from odoo.http import request
+from .general_functions import invalid_response, check_api_key
+from ..tools import metrics
+
+
+class OrderTechMetrics(http.Controller):
+
+    @http.route('/api/v1/metrics', type='http', methods=['GET'], auth='public', csrf=False)
+    def metrics(self):
+        """ Metrics of all the worker processes in the Prometheus text
+        format, plus the sync queue depth. """
+        if not check_api_key():
+            return invalid_response(
+                error='Unauthorized',
+                status=401
+            )
+        body = metrics.render(request.env['ordertech.sync.job'].sudo()._metrics_gauges())
+        return request.make_response(body, headers=[('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')])
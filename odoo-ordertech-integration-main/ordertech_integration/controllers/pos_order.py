@@ -1,210 +1,223 @@
 import json
 import logging
-from uuid import uuid4
-
-import requests
+import random
 
 from odoo import http
+from odoo.exceptions import ValidationError
 from odoo.http import request
-from .general_functions import invalid_response, check_api_key, generate_unique_id, valid_response
+from .general_functions import invalid_response, check_api_key, valid_response
+from ..tools import metrics, tracing
 
 _logger = logging.getLogger(__name__)
 
+MAX_BATCH_ORDERS = 100
+
+INBOUND_REQUESTS = metrics.counter(
+    'ordertech_inbound_requests_total', "Requests received on the OrderTech order API, by route and status.")
+INBOUND_STAGE = metrics.histogram(
+    'ordertech_inbound_stage_seconds', "Time spent per stage of the OrderTech order API (auth, decode, process, total).")
+ORDER_ROUTE = '/api/v1/order'
+
+
+def _stage(name):
+    return {'route': ORDER_ROUTE, 'stage': name}
+
+
+def _valid_lines(lines):
+    return isinstance(lines, list) and all(isinstance(line, dict) for line in lines)
+
 
 class PosOrder(http.Controller):
 
-    @http.route('/api/v1/order', type='http', methods=['POST'], auth='public', csrf=False)
+    @http.route(ORDER_ROUTE, type='http', methods=['POST'], auth='public', csrf=False)
     def create_order(self):
-        if not check_api_key():
+        debug = bool(request.session.debug)
+        sampled = self._trace_sampled()
+        with tracing.trace(ORDER_ROUTE, request.env.cr, debug or sampled) as trace, \
+                INBOUND_STAGE.time(_stage('total')):
+            response = self._handle_create_order()
+        INBOUND_REQUESTS.inc({'route': ORDER_ROUTE, 'status': response.status_code})
+        if trace:
+            if debug:
+                response.headers['Server-Timing'] = trace.server_timing()
+            if sampled:
+                request.env['ordertech.trace'].sudo()._log(trace, response.status_code)
+        return response
+
+    def _trace_sampled(self):
+        instance = request.env['ordertech.configration'].sudo()._get_instance()
+        return bool(instance and instance.trace_sample_rate and random.random() < instance.trace_sample_rate)
+
+    def _handle_create_order(self):
+        with INBOUND_STAGE.time(_stage('auth')), tracing.span('auth'):
+            authorized = check_api_key()
+        if not authorized:
             return invalid_response(
                 error='Unauthorized',
                 status=401
             )
         try:
-            args = request.httprequest.data.decode()
-            vals = json.loads(args)
+            with INBOUND_STAGE.time(_stage('decode')), tracing.span('decode'):
+                args = request.httprequest.data.decode()
+                vals = json.loads(args)
         except Exception as e:
             return invalid_response(
                 error=f"invalid Json type : {str(e)}"
             )
-        required_fields = ['ordertech_orderId', 'company_id', 'customer_id', 'product_id', 'qty']
+        required_fields = ['ordertech_orderId', 'company_id', 'customer_id']
+        if 'lines' in vals:
+            required_fields.append('lines')
+        else:
+            # single-line order, the line is given inline
+            required_fields += ['product_id', 'qty']
         missing_fields = [field for field in required_fields if not vals.get(field)]
 
         if missing_fields:
             return invalid_response(
                 error=f"Missing required field(s): {', '.join(missing_fields)}"
             )
-        existing = request.env['pos.order'].sudo().search([('ordertech_orderId', '=', vals.get('ordertech_orderId'))],
-                                                          limit=1)
-        if existing:
-            return valid_response(
-                message="order already exists",
-                data={
-                    'orderId': existing.id,
-                    'order_number': existing.tracking_number,
-                    'order_ref': existing.name,
-                    'receipt_number': existing.pos_reference,
-                    'status': existing.state,
-                },
-                status=200
-            )
-        company_id = request.env['res.company'].sudo().search([('ordertech_tenant_branchId', '=', vals['company_id'])],
-                                                              limit=1)
-        if not company_id:
+        if 'lines' in vals and not _valid_lines(vals['lines']):
             return invalid_response(
-                error=f"Company not found with this id : {vals['company_id']}"
+                error="Invalid lines value must be a list of objects"
             )
-        session = request.env['pos.session'].sudo().search([
-            ('state', '=', 'opened'),
-            ('company_id', '=', company_id.id)
-        ], limit=1)
+        key = request.httprequest.headers.get('Idempotency-Key') or vals['ordertech_orderId']
+        with INBOUND_STAGE.time(_stage('process')), tracing.span('process'):
+            if self._respond_async():
+                result = self._idempotent(key, lambda: self._accept_ordertech_order(vals))
+            else:
+                result = self._idempotent(key, lambda: self._create_ordertech_order(vals))
+        if 'error' in result:
+            return invalid_response(error=result['error'], status=result['status'])
+        return valid_response(message=result['message'], data=result['data'], status=result['status'])
 
-        if not session:
-            return invalid_response(
-                error="No open POS session"
-            )
-        partner_id = request.env['res.partner'].sudo().search([('ordertech_customerId', '=', vals['customer_id'])],
-                                                              limit=1)
-        if not partner_id:
+    @http.route('/api/v1/order/<string:ticket>', type='http', methods=['GET'], auth='public', csrf=False)
+    def get_order_request(self, ticket):
+        if not check_api_key():
             return invalid_response(
-                error=f"Customer not found with this id : {vals['customer_id']}"
+                error='Unauthorized',
+                status=401
             )
-        product_tmpl_id = request.env['product.template'].sudo().search(
-            [('ordertech_productId', '=', vals['product_id'])])
-        if not product_tmpl_id:
+        order_request = request.env['ordertech.order.request'].sudo().search([('ticket', '=', ticket)], limit=1)
+        if not order_request:
             return invalid_response(
-                error=f"Product not found with this id : {vals['product_id']}"
+                error=f"Order request not found with this ticket : {ticket}",
+                status=404
             )
-        product_id = product_tmpl_id.product_variant_id
-        tmpl_values = request.env['product.template.attribute.value'].sudo().search(
-            [('product_tmpl_id', '=', product_tmpl_id.id)])
-        value_ids = []
-        price_extra = 0
-        if vals.get('attributes'):
-            for val in vals['attributes']:
-                value_id = tmpl_values.filtered(
-                    lambda v: (
-                            v.product_tmpl_id.ordertech_productId == vals['product_id']
-                            and v.attribute_id.ordertech_addons_groupId == val.get('group_id')
-                            and v.product_attribute_value_id.ordertech_addons_itemId == val.get('item_id')
-                    )
-                )
-                if not value_id:
-                    return invalid_response(
-                        error=f"Not found addons group_id: {val.get('group_id')} or item_id: {val.get('item_id')}"
-                    )
-                value_ids.append(value_id.id)
-                if value_id.price_extra:
-                    price_extra += value_id.price_extra
-
-        if vals.get("size_value"):
-            value_id = tmpl_values.filtered(
-                lambda v: (
-                        v.name.strip().lower() == vals['size_value'].strip().lower()
-                        and v.attribute_id.id == request.env.ref(
-                    "ordertech_integration.ordertech_product_sizes_attribute").id
-                        and v.product_tmpl_id.id == product_tmpl_id.id
-                )
-            )
-            if not value_id:
-                return invalid_response(
-                    error=f"Size value {vals['size_value']} not found"
-                )
-            value_ids.append(value_id.id)
-            if value_id.price_extra:
-                price_extra += value_id.price_extra
+        return valid_response(
+            message=f"order request {order_request.state}",
+            data=order_request._response_data(),
+            status=200
+        )
+
+    def _respond_async(self):
+        """ Whether the order is only accepted now and created in the
+        background, per instance setting or on ``Prefer: respond-async``. """
+        if 'respond-async' in request.httprequest.headers.get('Prefer', ''):
+            return True
+        instance = request.env['ordertech.configration'].sudo()._get_instance()
+        return bool(instance and instance.async_orders)
 
-        qty = float(vals['qty'])
-        if qty <= 0:
+    @http.route('/api/v1/orders', type='http', methods=['POST'], auth='public', csrf=False)
+    def create_orders(self):
+        if not check_api_key():
             return invalid_response(
-                error="Invalid qty value must be greater than 0"
+                error='Unauthorized',
+                status=401
             )
-        uniq_id = generate_unique_id(session)
-        order_data = {
-            'session_id': session.id,
-            'company_id': session.company_id.id,
-            'config_id': session.config_id.id,
-            'picking_type_id': session.config_id.picking_type_id.id,
-            'sequence_number': int(uniq_id.split('-')[-1]),
-            'uuid': str(uuid4()),
-            'name': f"Order {uniq_id}",
-            'state': 'draft',
-            'partner_id': partner_id.id,
-            'amount_paid': 0.0,
-            'amount_tax': 0.0,
-            'amount_total': 0.0,
-            'amount_return': 0.0,
-            'general_note': 'OrderTech',
-            'ordertech_orderId': vals.get('ordertech_orderId'),
-            'lines': [
-                (0, 0, {
-                    'product_id': product_id.id,
-                    'qty': qty,
-                    'price_unit': product_id.lst_price + price_extra,
-                    'price_extra': price_extra,
-                    'price_subtotal': qty * (product_id.lst_price + price_extra),
-                    'price_subtotal_incl': qty * (product_id.lst_price + price_extra),
-                    'uuid': str(uuid4()),
-                    'attribute_value_ids': [(6, 0, value_ids)],
-                })
-            ]
-        }
-        pos_order = request.env['pos.order'].sudo()
         try:
-            process_order = pos_order._process_order(order_data, False)
+            args = request.httprequest.data.decode()
+            vals = json.loads(args)
         except Exception as e:
-            _logger.exception("Error create order from ordertech api request")
             return invalid_response(
-                error=str(e),
-                status=400
+                error=f"invalid Json type : {str(e)}"
+            )
+        orders = vals.get('orders') if isinstance(vals, dict) else None
+        if not isinstance(orders, list) or not orders or not all(isinstance(o, dict) for o in orders):
+            return invalid_response(
+                error="Missing required field(s): orders"
+            )
+        if len(orders) > MAX_BATCH_ORDERS:
+            return invalid_response(
+                error=f"Too many orders, at most {MAX_BATCH_ORDERS} per request",
+                status=413
             )
-        order = pos_order.browse(process_order)
-        order._compute_prices()
+        required_fields = ['ordertech_orderId', 'company_id', 'customer_id', 'lines']
+        results = []
+        for order_vals in orders:
+            missing_fields = [field for field in required_fields if not order_vals.get(field)]
+            if missing_fields:
+                result = {
+                    'error': f"Missing required field(s): {', '.join(missing_fields)}",
+                    'status': 400,
+                }
+            elif not _valid_lines(order_vals['lines']):
+                result = {
+                    'error': "Invalid lines value must be a list of objects",
+                    'status': 400,
+                }
+            else:
+                result = self._idempotent(
+                    order_vals['ordertech_orderId'],
+                    lambda: self._create_ordertech_order(order_vals),
+                )
+            result['ordertech_orderId'] = order_vals.get('ordertech_orderId')
+            results.append(result)
         return valid_response(
-            message="order created successfully",
-            data={
-                'orderId': order.id,
-                'order_number': order.tracking_number,
-                'receipt_number': order.pos_reference,
-                'status': order.state,
-            },
-            status=201
+            message=f"{sum(1 for r in results if 'error' not in r)}/{len(results)} orders processed",
+            data=results,
+            status=200
         )
 
-    @http.route('/pos/order/webhook', type='json', auth='user')
-    def pos_order_webhook(self, **data):
-        order_id = data.get('order_id')
-        order = request.env['pos.order'].sudo().search([
-            ('id', '=', order_id)
-        ], limit=1)
-        if order.ordertech_orderId:
-            instance = request.env.ref("ordertech_integration.default_ordertech_instance")
-            if not instance or not instance.ordertech_token:
-                _logger.error("OrderTech instance missing, order status sync skipped.")
-                return False
-            url = f"{instance.url}/api/integrations/odoo/webhook/order-status"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
-                "order_id": order.ordertech_orderId,
-                "status": "preparing",
-            })
-            try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
-                if response.status_code != 201:
-                    _logger.error(
-                        "OrderTech update order status failed for order %s: %s ",
-                        order.id, response.text,
-                    )
-                    return False
-                _logger.info("Successfully update order status for order %s", order.id)
-            except Exception as e:
-                _logger.error(
-                    "OrderTech API request error for order %s: %s",
-                    order.id,
-                    str(e),
-                )
+    def _idempotent(self, key, process):
+        """ Run ``process`` once per idempotency ``key`` and store its
+        result; a replay of the key gets the stored result back without
+        processing the order again. Errors are not stored so that a retry
+        is processed anew. """
+        with tracing.span('idempotency'):
+            claim, claimed = request.env['ordertech.idempotency.key'].sudo()._claim(str(key))
+        if not claimed:
+            return claim._stored_result()
+        result = process()
+        if 'error' in result:
+            claim.unlink()
+        else:
+            claim._store(result)
+        return result
 
+    def _accept_ordertech_order(self, vals):
+        try:
+            order_request = request.env['ordertech.order.request'].sudo()._accept(vals)
+        except ValidationError as e:
+            return {'error': e.args[0], 'status': 400}
+        return {
+            'message': "order accepted",
+            'data': order_request._response_data(),
+            'status': 202,
+        }
+
+    def _create_ordertech_order(self, vals):
+        """ Create one OrderTech order in its own savepoint and return the
+        result as a dict with either ``message`` and ``data`` or ``error``,
+        plus the HTTP ``status``. """
+        registry = request.env['ordertech.id.registry'].sudo()
+        existing = registry._resolve('pos.order', vals['ordertech_orderId'])
+        if existing:
+            return {
+                'message': "order already exists",
+                'data': dict(existing._ordertech_response_data(), order_ref=existing.name),
+                'status': 200,
+            }
+        pos_order = request.env['pos.order'].sudo()
+        try:
+            with request.env.cr.savepoint():
+                order = pos_order._ordertech_create_order(vals)
+        except ValidationError as e:
+            return {'error': e.args[0], 'status': 400}
+        except Exception as e:
+            _logger.exception("Error create order from ordertech api request")
+            return {'error': str(e), 'status': 400}
+        return {
+            'message': "order created successfully",
+            'data': order._ordertech_response_data(),
+            'status': 201,
+        }
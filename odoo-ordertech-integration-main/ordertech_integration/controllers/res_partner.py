@@ -4,6 +4,7 @@ import logging
 from odoo import http
 from odoo.http import request
 from .general_functions import valid_response, invalid_response, check_api_key
+from ..tools import tracing
 
 _logger = logging.getLogger(__name__)
 
@@ -12,6 +13,14 @@ class ResPartner(http.Controller):
 
     @http.route('/api/v1/customer', type='http', methods=['POST'], auth='public', csrf=False)
     def create_customer(self):
+        debug = bool(request.session.debug)
+        with tracing.trace('/api/v1/customer', request.env.cr, debug) as trace:
+            response = self._handle_create_customer()
+        if trace:
+            response.headers['Server-Timing'] = trace.server_timing()
+        return response
+
+    def _handle_create_customer(self):
         if not check_api_key():
             return invalid_response(
                 error='Unauthorized',
@@ -31,7 +40,8 @@ class ResPartner(http.Controller):
             return invalid_response(
                 error=f"Missing required field(s): {', '.join(missing_fields)}"
             )
-        exists_customer = request.env['res.partner'].sudo().search([('ordertech_customerId','=',vals['ordertech_customerId'])],limit=1)
+        registry = request.env['ordertech.id.registry'].sudo()
+        exists_customer = registry._resolve('res.partner', vals['ordertech_customerId'])
         if exists_customer:
             return valid_response(
                 message="Customer already exists",
@@ -48,8 +58,7 @@ class ResPartner(http.Controller):
             "phone": vals['phone'],
             "email": vals.get('email')
         }
-        company = request.env['res.company'].sudo().search(
-            [('ordertech_tenant_branchId', '=', vals['ordertech_tenant_branchId'])], limit=1)
+        company = registry._resolve('res.company', vals['ordertech_tenant_branchId'])
         if not company:
             return invalid_response(
                 error=f"tenant branch {vals['ordertech_tenant_branchId']} not found or not synced yet ",
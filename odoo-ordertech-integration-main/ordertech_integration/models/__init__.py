@@ -1,9 +1,21 @@
 from . import ordertech_configration
+from . import ordertech_sync_mixin
+from . import ordertech_sync_job
+from . import ordertech_sync_watermark
+from . import ordertech_menu_sync
+from . import ordertech_menu_reconcile
+from . import ordertech_id_registry
 from . import res_company
 from . import res_partner
 from . import product_template
 from . import pos_category
 from . import product_attribute
 from . import product_attribute_value
+from . import product_template_attribute_value
+from . import pos_config
+from . import pos_session
 from . import pos_order
+from . import ordertech_order_request
+from . import ordertech_idempotency_key
+from . import ordertech_trace
 from . import preparation_display_order
\ No newline at end of file
@@ -1,6 +1,10 @@
+import contextvars
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 
-from odoo import models, fields, _
+from odoo import api, models, fields, _
+
+from ..tools import http_client
 
 
 class OrderTechConfigration(models.Model):
@@ -12,8 +16,105 @@ class OrderTechConfigration(models.Model):
     url = fields.Char(string='OrderTech URL', required=True)
     api_key = fields.Char(string='API Key')
     ordertech_token = fields.Char(string='OrderTech Token')
+    pool_size = fields.Integer(string='Connection Pool Size', default=10)
+    connect_timeout = fields.Float(string='Connect Timeout (s)', default=5.0)
+    read_timeout = fields.Float(string='Read Timeout (s)', default=10.0)
+    max_retries = fields.Integer(string='Max Retries', default=3,
+                                 help="Retries of idempotent requests (GET, PUT, DELETE) on connection errors and 502/503/504.")
+    retry_backoff = fields.Float(string='Retry Backoff Factor', default=0.5)
+    async_orders = fields.Boolean(string='Asynchronous Order Acceptance',
+                                  help="Answer /api/v1/order with 202 and a ticket right away and create the order "
+                                       "in the background; the result is reported on the order-status webhook. "
+                                       "Clients can also ask for it per request with 'Prefer: respond-async'.")
+    max_workers = fields.Integer(string='Parallel Requests', default=8,
+                                 help="Number of requests sent concurrently by bulk syncs. Keep it below the pool size.")
+    rate_limit = fields.Float(string='Rate Limit (req/s)', default=20.0,
+                              help="Requests per second sent to OrderTech from each worker. 0 disables it.")
+    tenant_rate_limit = fields.Float(string='Tenant Rate Limit (req/s)', default=10.0,
+                                     help="Requests per second sent for a single restaurant from each worker. "
+                                          "0 disables it.")
+    trace_sample_rate = fields.Float(string='Trace Sample Rate', default=0.0,
+                                     help="Share (0 to 1) of /api/v1/order requests whose stage timings are logged "
+                                          "in OrderTech Traces. In debug mode they are also returned in the "
+                                          "Server-Timing response header.")
+    breaker_threshold = fields.Integer(string='Circuit Breaker Threshold', default=5,
+                                       help="Consecutive failed or slow requests after which OrderTech is considered "
+                                            "down and requests fail at once. 0 disables the circuit breaker.")
+    breaker_reset_timeout = fields.Float(string='Circuit Breaker Reset (s)', default=30.0,
+                                         help="Delay before a probe request checks whether OrderTech is back.")
+    slow_call_threshold = fields.Float(string='Slow Call Threshold (s)', default=5.0,
+                                       help="Requests slower than this count as failures for the circuit breaker. "
+                                            "0 disables it.")
 
     def refresh_api_key(self):
         for rec in self:
             saved_key = secrets.token_hex(32)
-            rec.api_key = saved_key
\ No newline at end of file
+            rec.api_key = saved_key
+
+    @api.model
+    def _get_instance(self):
+        return self.env.ref('ordertech_integration.default_ordertech_instance', raise_if_not_found=False)
+
+    def _get_client_params(self):
+        self.ensure_one()
+        return {
+            'key': (self.env.cr.dbname, self.id),
+            'url': (self.url or '').rstrip('/'),
+            'token': self.ordertech_token,
+            'timeout': (self.connect_timeout or None, self.read_timeout or None),
+            'pool_size': max(self.pool_size, 1),
+            'max_retries': max(self.max_retries, 0),
+            'retry_backoff': self.retry_backoff,
+            'breaker_threshold': max(self.breaker_threshold, 0),
+            'breaker_reset_timeout': self.breaker_reset_timeout,
+            'slow_call': self.slow_call_threshold,
+            'max_workers': max(self.max_workers, 1),
+            'rate_limit': max(self.rate_limit, 0),
+            'tenant_rate_limit': max(self.tenant_rate_limit, 0),
+        }
+
+    def _ordertech_request(self, method, endpoint, payload=None):
+        return http_client.send(self._get_client_params(), method, endpoint, payload)
+
+    def _ordertech_retry_in(self):
+        """ Seconds before OrderTech may be called again, 0 unless the
+        circuit breaker is open. """
+        return http_client.retry_in(self._get_client_params())
+
+    @api.model
+    def _ordertech_tenant(self, record):
+        """ OrderTech tenant (restaurant) id ``record`` is synced for. """
+        if record._name == 'res.company':
+            company = record
+        elif 'company_id' in record._fields:
+            company = record.company_id
+        elif record._name == 'product.attribute.value':
+            company = record.attribute_id.company_id
+        else:
+            return None
+        return company.ordertech_tenantId or company.parent_id.ordertech_tenantId or None
+
+    def _ordertech_dispatch(self, calls):
+        """ Send ``calls``, a list of ``(record, method, endpoint, payload)``,
+        concurrently over the connection pool and yield ``(record, result)``
+        in the same order, where ``result()`` returns the response or raises
+        the request error. The number of requests in flight adapts to the
+        rate limits of OrderTech (see ``http_client.send``).
+
+        Payloads must be fully built beforehand: worker threads only do I/O
+        and never touch the ORM.
+        """
+        if not calls:
+            return
+        params = self._get_client_params()
+        tenants = [self._ordertech_tenant(record) for record, *_args in calls]
+        workers = min(params['max_workers'], len(calls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ordertech') as executor:
+            futures = [
+                # the context carries the current trace into the worker threads
+                executor.submit(contextvars.copy_context().run,
+                                http_client.send, params, method, endpoint, payload, tenant, record._name)
+                for (record, method, endpoint, payload), tenant in zip(calls, tenants)
+            ]
+            for (record, *_args), future in zip(calls, futures):
+                yield record, future.result
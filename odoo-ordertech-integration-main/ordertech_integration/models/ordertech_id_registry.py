@@ -0,0 +1,54 @@
+from odoo import api, models, tools
+
+# OrderTech ids resolved by the inbound API, per model
+EXTERNAL_ID_FIELDS = {
+    'res.company': 'ordertech_tenant_branchId',
+    'res.partner': 'ordertech_customerId',
+    'product.template': 'ordertech_productId',
+    'pos.order': 'ordertech_orderId',
+}
+
+
+class NotMapped(Exception):
+    pass
+
+
+class OrderTechIdRegistry(models.AbstractModel):
+    _name = 'ordertech.id.registry'
+    _description = 'OrderTech ID Mapping'
+
+    @api.model
+    def _resolve(self, model_name, external_id):
+        """ Return the record of ``model_name`` mapped to the OrderTech id
+        ``external_id``, or an empty recordset.
+
+        Hits are kept in the worker's LRU cache (``ormcache``). Misses are not
+        cached, so a mapping assigned afterwards is found at once and only
+        changing or removing an existing mapping needs an invalidation.
+        """
+        if not external_id:
+            return self.env[model_name].browse()
+        try:
+            return self.env[model_name].browse(self._lookup(model_name, str(external_id)))
+        except NotMapped:
+            return self.env[model_name].browse()
+
+    @api.model
+    @tools.ormcache('model_name', 'external_id')
+    def _lookup(self, model_name, external_id):
+        field_name = EXTERNAL_ID_FIELDS[model_name]
+        record = self.env[model_name].sudo().search([(field_name, '=', external_id)], limit=1)
+        if not record:
+            raise NotMapped(external_id)
+        return record.id
+
+    @api.model
+    def _invalidate(self, records, vals=None):
+        """ Clear the cache when ``records`` lose or change their OrderTech id,
+        i.e. on unlink (no ``vals``) or when writing ``vals`` over a set id or
+        archiving a mapped record. """
+        field_name = EXTERNAL_ID_FIELDS[records._name]
+        if vals is not None and not {field_name, 'active'} & vals.keys():
+            return
+        if any(records.mapped(field_name)):
+            self.env.registry.clear_cache()
@@ -0,0 +1,59 @@
+import json
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+KEY_LIFETIME_DAYS = 7
+
+
+class OrderTechIdempotencyKey(models.Model):
+    _name = 'ordertech.idempotency.key'
+    _description = 'OrderTech Idempotency Key'
+    _rec_name = 'key'
+
+    key = fields.Char(required=True, readonly=True)
+    status_code = fields.Integer(readonly=True)
+    response_body = fields.Text(readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', "An idempotency key can only be used once."),
+    ]
+
+    @api.model
+    def _claim(self, key):
+        """ Claim ``key`` for the current request and return ``(record, claimed)``.
+
+        The key is inserted with ``ON CONFLICT DO NOTHING``: a concurrent
+        request holding the same key waits on the unique index until the first
+        transaction ends, then either claims the key itself (rolled back) or
+        fails to serialize and is retried by the HTTP layer, which then finds
+        the stored response (committed).
+        """
+        self.env.cr.execute("""
+            INSERT INTO ordertech_idempotency_key (key, create_uid, create_date, write_uid, write_date)
+            VALUES (%(key)s, %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (key) DO NOTHING
+            RETURNING id
+        """, {'key': key, 'uid': self.env.uid})
+        row = self.env.cr.fetchone()
+        if row:
+            return self.browse(row[0]), True
+        return self.search([('key', '=', key)], limit=1), False
+
+    def _store(self, result):
+        self.ensure_one()
+        self.write({
+            'status_code': result['status'],
+            'response_body': json.dumps(result),
+        })
+
+    def _stored_result(self):
+        self.ensure_one()
+        if not self.response_body:
+            return {'error': "A request with this idempotency key is already in progress", 'status': 409}
+        return json.loads(self.response_body)
+
+    @api.autovacuum
+    def _gc_expired_keys(self):
+        limit_date = fields.Datetime.now() - timedelta(days=KEY_LIFETIME_DAYS)
+        self.search([('create_date', '<', limit_date)]).unlink()
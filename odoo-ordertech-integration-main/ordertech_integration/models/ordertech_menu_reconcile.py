@@ -0,0 +1,272 @@
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+from .ordertech_sync_job import MAX_ATTEMPTS
+
+_logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+MAX_PAGES = 1000
+
+
+class OrderTechMenuReconcile(models.AbstractModel):
+    _name = 'ordertech.menu.reconcile'
+    _description = 'OrderTech Menu Reconciliation'
+
+    @api.model
+    def _get_entities(self, company):
+        """ ``(entity, local records, OrderTech id field, remote collection,
+        remote item endpoint, create method, update method)``, run in this
+        order since each entity references the ids of the previous ones. """
+        tenant = company.ordertech_tenantId
+        return [
+            ('categories', self.env['pos.category'].search([('company_id', '=', company.id)]),
+             'ordertech_categId', f"/api/menu/categories/{tenant}", "/api/menu/categories/%s",
+             'create_tenant_category_api', 'update_tenant_categId_api'),
+            ('addon groups', self.env['product.attribute'].search([
+                ('company_id', '=', company.id), ('is_addons', '=', True)]),
+             'ordertech_addons_groupId', f"/api/menu/addon-groups/{tenant}", "/api/menu/addon-groups/%s",
+             'create_tenant_addons_group_api', 'update_tenant_addons_group_api'),
+            ('addon items', self.env['product.attribute.value'].search([
+                ('attribute_id.company_id', '=', company.id), ('attribute_id.is_addons', '=', True)]),
+             'ordertech_addons_itemId', f"/api/menu/addon-items/{tenant}", "/api/menu/addon-items/%s",
+             'create_tenant_addon_item_api', 'update_tenant_addon_item_api'),
+            ('products', self.env['product.template'].search([
+                ('company_id', '=', company.id), ('available_in_pos', '=', True)]),
+             'ordertech_productId', f"/api/menu/products/{tenant}", "/api/menu/products/%s",
+             'create_tenant_product_api', 'update_tenant_product_api'),
+        ]
+
+    @api.model
+    def _match_key(self, record, payload):
+        """ Natural key matching a local record to a remote one: the slug, or
+        the English name within its group for add-on items. """
+        if record._name == 'product.attribute.value':
+            return record.attribute_id.ordertech_addons_groupId, payload.get('name_en')
+        return payload.get('slug') or payload.get('name_en')
+
+    @api.model
+    def _remote_key(self, entity, remote):
+        if entity == 'addon items':
+            return remote.get('group_id'), remote.get('name_en')
+        return remote.get('slug') or remote.get('name_en')
+
+    @api.model
+    def _fetch_remote(self, instance, collection):
+        """ Page through an OrderTech collection and return its items. """
+        items = []
+        for page in range(1, MAX_PAGES + 1):
+            response = instance._ordertech_request("GET", f"{collection}?page={page}&limit={PAGE_SIZE}")
+            if response.status_code != 200:
+                raise UserError(_("OrderTech returned %(status)s listing %(collection)s: %(error)s",
+                                  status=response.status_code, collection=collection, error=response.text))
+            data = response.json()
+            batch = data if isinstance(data, list) else (data.get('items') or data.get('data') or [])
+            items += batch
+            if len(batch) < PAGE_SIZE or (isinstance(data, dict) and data.get('has_more') is False):
+                break
+        return items
+
+    @api.model
+    def _diff(self, entity, records, id_field, remote_items):
+        """ Compare local ``records`` to ``remote_items`` in memory and return
+        the minimal set of changes as a dict of:
+
+        - ``relink``: ``{record: remote id}``, local records matching a remote
+          one by key but holding no or a stale OrderTech id;
+        - ``create``: records missing remotely;
+        - ``update``: records whose remote values differ from their payload;
+        - ``delete``: remote ids matching no local record (orphans and
+          duplicates).
+        """
+        remote_by_id = {str(item.get('id')): item for item in remote_items if item.get('id')}
+        remote_by_key = {}
+        for item in remote_items:
+            remote_by_key.setdefault(self._remote_key(entity, item), []).append(item)
+        payloads = records._prepare_ordertech_payloads()
+        diff = {'relink': {}, 'create': records.browse(), 'update': records.browse(), 'delete': []}
+        # every record is matched by id first, so that a remote item linked
+        # to a record is never relinked by key to another one
+        remotes, matched = {}, set()
+        for record in records.filtered(id_field):
+            remote_id = str(record[id_field])
+            if remote_id in remote_by_id and remote_id not in matched:
+                remotes[record] = remote_by_id[remote_id]
+                matched.add(remote_id)
+        for record in records:
+            remote = remotes.get(record)
+            if remote is None:
+                candidates = [
+                    item for item in remote_by_key.get(self._match_key(record, payloads.get(record, {})), [])
+                    if str(item.get('id')) not in matched
+                ]
+                if not candidates:
+                    diff['create'] |= record
+                    continue
+                remote = candidates[0]
+                matched.add(str(remote['id']))
+                diff['relink'][record] = str(remote['id'])
+            if any(remote[key] != value for key, value in payloads.get(record, {}).items() if key in remote):
+                diff['update'] |= record
+        diff['delete'] = [remote_id for remote_id in remote_by_id if remote_id not in matched]
+        return diff
+
+    @api.model
+    def _apply(self, instance, company, records, id_field, item_endpoint, create_method, update_method, diff):
+        """ Apply ``diff`` with bulk calls and return ``(failed records, failed
+        remote ids)``: the records are left to the sync queue, the deletions to
+        the next run of the reconciliation. """
+        sync_job = self.env['ordertech.sync.job']
+        failed = records.browse()
+        # stale ids are dropped so that the records are created again
+        stale = diff['create'].filtered(id_field)
+        if stale:
+            stale.sudo().write({id_field: False, 'ordertech_payload_hash': False})
+        for record, remote_id in diff['relink'].items():
+            record.sudo().write({id_field: remote_id, 'ordertech_payload_hash': False})
+        failed |= sync_job._run_now(diff['create'], create_method)
+        if diff['update']:
+            # the fingerprint tells what OrderTech accepted, not what it holds
+            diff['update'].sudo().write({'ordertech_payload_hash': False})
+            failed |= sync_job._run_now(diff['update'], update_method)
+        calls = [(company, "DELETE", item_endpoint % remote_id, None) for remote_id in diff['delete']]
+        delete_failed = []
+        for remote_id, (_record, result) in zip(diff['delete'], instance._ordertech_dispatch(calls)):
+            endpoint = item_endpoint % remote_id
+            try:
+                response = result()
+                # already gone is as good as deleted
+                if response.status_code not in (200, 204, 404):
+                    delete_failed.append(remote_id)
+                    _logger.error("OrderTech delete failed for %s: %s ", endpoint, response.text)
+            except Exception as e:
+                delete_failed.append(remote_id)
+                _logger.error("OrderTech API request error for %s: %s", endpoint, str(e))
+        return failed, delete_failed
+
+    @api.model
+    def _reconcile(self, company, apply=True):
+        """ Reconcile the menu of the OrderTech tenant ``company`` and return
+        the number of changes per entity; with ``apply=False`` the diff is
+        only computed.
+
+        Changes are committed after each entity, since the creations and
+        deletions done on OrderTech cannot be rolled back with the ids written
+        locally. """
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            raise UserError(_("OrderTech instance is missing."))
+        stats = []
+        for entity, records, id_field, collection, item_endpoint, create_method, update_method \
+                in self._get_entities(company):
+            diff = self._diff(entity, records, id_field, self._fetch_remote(instance, collection))
+            if entity == 'addon items':
+                # items of groups unknown to OrderTech cannot be created
+                diff['create'] = diff['create'].filtered('attribute_id.ordertech_addons_groupId')
+            elif entity == 'products':
+                # products are pushed once one of their categories is synced
+                has_category = lambda p: any(c.ordertech_categId for c in p.pos_categ_ids)
+                diff['create'] = diff['create'].filtered(has_category)
+                diff['update'] = diff['update'].filtered(has_category)
+            failed, delete_failed = records.browse(), []
+            if apply:
+                failed, delete_failed = self._apply(
+                    instance, company, records, id_field, item_endpoint, create_method, update_method, diff)
+                if not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+            stats.append({
+                'entity': entity,
+                'relink': len(diff['relink']),
+                'create': len(diff['create']),
+                'update': len(diff['update']),
+                'delete': len(diff['delete']),
+                'failed': len(failed) + len(delete_failed),
+                'delete_failed': len(delete_failed),
+            })
+            _logger.info("OrderTech reconciliation of %s for company %s: %s", entity, company.id, stats[-1])
+        return stats
+
+    @api.model
+    def _action_run(self, companies, apply=True):
+        """ Preview the reconciliation of ``companies``, or with ``apply``
+        schedule it: it runs in a cron, which commits after every entity,
+        rather than in the request. """
+        if apply:
+            companies.sudo().write({
+                'ordertech_menu_reconcile_pending': True,
+                'ordertech_menu_reconcile_attempts': 0,
+                'ordertech_menu_reconcile_user_id': self.env.uid,
+            })
+            self.env.ref('ordertech_integration.ir_cron_ordertech_menu_reconcile').sudo()._trigger()
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _("OrderTech Menu Reconciliation"),
+                    'message': _("The menu reconciliation has been scheduled, "
+                                 "you will be notified when it is done."),
+                    'type': 'info',
+                },
+            }
+        lines = [
+            line
+            for company in companies
+            for line in self._notification_lines(company, self._reconcile(company, apply=False), apply=False)
+        ]
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("OrderTech Menu Reconciliation Preview"),
+                'message': "\n".join(lines),
+                'type': 'info',
+                'sticky': True,
+            },
+        }
+
+    @api.model
+    def _cron_run(self):
+        """ Reconcile the companies whose reconciliation was requested. Failed
+        deletions run the reconciliation again after a backoff, up to
+        ``MAX_ATTEMPTS`` times; the other failures are left to the sync queue. """
+        companies = self.env['res.company'].sudo().search([
+            ('ordertech_menu_reconcile_pending', '=', True),
+        ])
+        for company in companies:
+            user = company.ordertech_menu_reconcile_user_id
+            stats = self._reconcile(company)
+            attempts = company.ordertech_menu_reconcile_attempts + 1
+            retry = any(s['delete_failed'] for s in stats) and attempts < MAX_ATTEMPTS
+            company.write({
+                'ordertech_menu_reconcile_pending': retry,
+                'ordertech_menu_reconcile_attempts': attempts if retry else 0,
+                'ordertech_menu_reconcile_user_id': user.id if retry else False,
+            })
+            if retry:
+                self.env.ref('ordertech_integration.ir_cron_ordertech_menu_reconcile')._trigger(
+                    fields.Datetime.now() + timedelta(minutes=2 ** attempts))
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            if user:
+                user._bus_send('simple_notification', {
+                    'title': _("OrderTech Menu Reconciliation: %s", company.name),
+                    'message': "\n".join(self._notification_lines(company, stats)),
+                    'type': 'warning' if any(s['failed'] for s in stats) else 'success',
+                    'sticky': True,
+                })
+        return True
+
+    @api.model
+    def _notification_lines(self, company, stats, apply=True):
+        if apply:
+            return [_(
+                "%(company)s %(entity)s: %(create)s created, %(update)s updated, %(delete)s deleted, "
+                "%(relink)s relinked, %(failed)s failed",
+                company=company.name, **s) for s in stats]
+        return [_(
+            "%(company)s %(entity)s: %(create)s to create, %(update)s to update, %(delete)s to delete, "
+            "%(relink)s to relink",
+            company=company.name, **s) for s in stats]
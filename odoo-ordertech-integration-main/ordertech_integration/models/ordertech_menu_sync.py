@@ -0,0 +1,124 @@
+import logging
+import time
+
+from odoo import api, models, _
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 100
+
+
+class OrderTechMenuSync(models.AbstractModel):
+    _name = 'ordertech.menu.sync'
+    _description = 'OrderTech Menu Onboarding'
+
+    @api.model
+    def _get_stages(self, companies):
+        """ Stages are run in this order since each one references the
+        OrderTech ids created by the previous ones. Domains are evaluated when
+        the stage starts. """
+        return [
+            ('categories', 'pos.category', [
+                ('company_id', 'in', companies.ids),
+                ('ordertech_categId', '=', False),
+            ], 'create_tenant_category_api'),
+            ('addon groups', 'product.attribute', [
+                ('company_id', 'in', companies.ids),
+                ('is_addons', '=', True),
+                ('ordertech_addons_groupId', '=', False),
+            ], 'create_tenant_addons_group_api'),
+            ('addon items', 'product.attribute.value', [
+                ('attribute_id.company_id', 'in', companies.ids),
+                ('attribute_id.ordertech_addons_groupId', '!=', False),
+                ('ordertech_addons_itemId', '=', False),
+            ], 'create_tenant_addon_item_api'),
+            ('products', 'product.template', [
+                ('company_id', 'in', companies.ids),
+                ('available_in_pos', '=', True),
+                ('pos_categ_ids.ordertech_categId', '!=', False),
+                ('ordertech_productId', '=', False),
+            ], 'create_tenant_product_api'),
+        ]
+
+    @api.model
+    def _run(self, companies):
+        stats = []
+        for stage, model, domain, method in self._get_stages(companies):
+            records = self.env[model].search(domain)
+            stats.append(self._run_stage(stage, records, method))
+        return stats
+
+    @api.model
+    def _run_stage(self, stage, records, method):
+        total, failed = len(records), 0
+        start = time.monotonic()
+        for index in range(0, total, CHUNK_SIZE):
+            chunk_failed = self.env['ordertech.sync.job']._run_now(records[index:index + CHUNK_SIZE], method)
+            failed += len(chunk_failed)
+            # keep the OrderTech ids written so far if the run is interrupted
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            done = min(index + CHUNK_SIZE, total)
+            elapsed = time.monotonic() - start
+            _logger.info(
+                "OrderTech menu sync [%s]: %s/%s pushed, %s failed (%.1f records/s)",
+                stage, done, total, failed, done / elapsed if elapsed else 0.0,
+            )
+        elapsed = time.monotonic() - start
+        return {
+            'stage': stage,
+            'total': total,
+            'failed': failed,
+            'duration': elapsed,
+            'throughput': total / elapsed if elapsed else 0.0,
+        }
+
+    @api.model
+    def _action_run(self, companies):
+        """ Schedule the onboarding of ``companies``: it runs in a cron,
+        which commits after every chunk, rather than in the request. """
+        companies.sudo().write({
+            'ordertech_menu_sync_pending': True,
+            'ordertech_menu_sync_user_id': self.env.uid,
+        })
+        self.env.ref('ordertech_integration.ir_cron_ordertech_menu_sync').sudo()._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("OrderTech Menu Sync"),
+                'message': _("The menu sync has been scheduled, you will be notified when it is done."),
+                'type': 'info',
+            },
+        }
+
+    @api.model
+    def _cron_run(self):
+        """ Onboard the companies whose menu sync was requested. A run
+        interrupted by the time limit resumes where it stopped: stages only
+        select records not synced yet. """
+        companies = self.env['res.company'].sudo().search([('ordertech_menu_sync_pending', '=', True)])
+        for company in companies:
+            user = company.ordertech_menu_sync_user_id
+            stats = self._run(company)
+            company.write({'ordertech_menu_sync_pending': False, 'ordertech_menu_sync_user_id': False})
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            if user:
+                user._bus_send('simple_notification', self._notification_params(company, stats))
+        return True
+
+    @api.model
+    def _notification_params(self, company, stats):
+        lines = [
+            _("%(stage)s: %(synced)s/%(total)s synced in %(duration).1fs (%(throughput).1f/s)",
+              stage=s['stage'], synced=s['total'] - s['failed'], total=s['total'],
+              duration=s['duration'], throughput=s['throughput'])
+            for s in stats
+        ]
+        return {
+            'title': _("OrderTech Menu Sync: %s", company.name),
+            'message': "\n".join(lines),
+            'type': 'warning' if any(s['failed'] for s in stats) else 'success',
+            'sticky': True,
+        }
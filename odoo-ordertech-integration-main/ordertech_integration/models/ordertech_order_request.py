@@ -0,0 +1,147 @@
+import json
+import logging
+from uuid import uuid4
+
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+
+class OrderTechOrderRequest(models.Model):
+    _name = 'ordertech.order.request'
+    _description = 'OrderTech Order Request'
+    _order = 'id desc'
+    _rec_name = 'ticket'
+
+    ticket = fields.Char(required=True, readonly=True, index=True, copy=False, default=lambda self: str(uuid4()))
+    ordertech_orderId = fields.Char(string='OrderTech OrderId', required=True, readonly=True, index=True)
+    payload = fields.Text(required=True, readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='pending', required=True, readonly=True, index=True)
+    pos_order_id = fields.Many2one('pos.order', readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def _accept(self, vals):
+        """ Store an order to be created by the cron and return its request;
+        an order already accepted returns the existing request.
+
+        The branch, customer and products are checked before, so that an
+        order referencing unknown ids is rejected at once rather than failed
+        by the cron. """
+        existing = self.sudo().search([('ordertech_orderId', '=', vals['ordertech_orderId'])], limit=1)
+        if existing:
+            return existing
+        self._validate(vals)
+        request = self.sudo().create({
+            'ordertech_orderId': vals['ordertech_orderId'],
+            'payload': json.dumps(vals),
+        })
+        self.env.ref('ordertech_integration.ir_cron_ordertech_order_requests').sudo()._trigger()
+        return request
+
+    @api.model
+    def _validate(self, vals):
+        """ Raise if the OrderTech ids of the order ``vals`` are not mapped. """
+        registry = self.env['ordertech.id.registry'].sudo()
+        if not registry._resolve('res.company', vals.get('company_id')):
+            raise ValidationError(f"Company not found with this id : {vals.get('company_id')}")
+        if not registry._resolve('res.partner', vals.get('customer_id')):
+            raise ValidationError(f"Customer not found with this id : {vals.get('customer_id')}")
+        for line in vals.get('lines') or [vals]:
+            if not registry._resolve('product.template', line.get('product_id')):
+                raise ValidationError(f"Product not found with this id : {line.get('product_id')}")
+
+    def _response_data(self):
+        self.ensure_one()
+        data = {
+            'ticket': self.ticket,
+            'status': self.state,
+        }
+        if self.pos_order_id:
+            data['order'] = self.pos_order_id._ordertech_response_data()
+        if self.error:
+            data['error'] = self.error
+        return data
+
+    @api.model
+    def _cron_process_requests(self, batch_size=BATCH_SIZE):
+        requests = self.search([('state', '=', 'pending')], order='id', limit=batch_size)
+        for request in requests:
+            request._process()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+        if len(requests) == batch_size:
+            self.env.ref('ordertech_integration.ir_cron_ordertech_order_requests')._trigger()
+        return True
+
+    def _process(self):
+        pos_order = self.env['pos.order'].sudo()
+        registry = self.env['ordertech.id.registry'].sudo()
+        for request in self:
+            vals = json.loads(request.payload)
+            try:
+                with self.env.cr.savepoint():
+                    order = registry._resolve('pos.order', request.ordertech_orderId)
+                    if not order:
+                        order = pos_order._ordertech_create_order(vals)
+                request.write({'state': 'done', 'pos_order_id': order.id, 'error': False})
+            except ValidationError as e:
+                request.write({'state': 'failed', 'error': e.args[0]})
+            except Exception as e:
+                _logger.exception("Error create order from ordertech order request %s", request.ticket)
+                request.write({'state': 'failed', 'error': str(e)})
+            self.env['ordertech.sync.job']._enqueue(request, '_ordertech_notify_result')
+
+    def _ordertech_notify_result(self):
+        """ Report the outcome of each request on the order-status webhook. """
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            _logger.error("OrderTech instance missing, order status sync skipped.")
+            return self
+        calls = []
+        for request in self:
+            payload = {
+                "order_id": request.ordertech_orderId,
+                "status": "accepted" if request.state == 'done' else "rejected",
+            }
+            if request.pos_order_id:
+                payload.update({
+                    "odoo_order_id": request.pos_order_id.id,
+                    "order_number": request.pos_order_id.tracking_number,
+                    "receipt_number": request.pos_order_id.pos_reference,
+                })
+            if request.error:
+                payload["reason"] = request.error
+            calls.append((request, "POST", "/api/integrations/odoo/webhook/order-status", payload))
+        failed = self.browse()
+        for request, result in instance._ordertech_dispatch(calls):
+            try:
+                response = result()
+                if response.status_code != 201:
+                    failed |= request
+                    _logger.error(
+                        "OrderTech update order status failed for order request %s: %s ",
+                        request.ticket, response.text,
+                    )
+                    continue
+                _logger.info("Successfully update order status for order request %s", request.ticket)
+            except Exception as e:
+                failed |= request
+                _logger.error(
+                    "OrderTech API request error for order request %s: %s",
+                    request.ticket,
+                    str(e),
+                )
+        return failed
+
+    def action_retry(self):
+        self.filtered(lambda r: r.state == 'failed').write({'state': 'pending', 'error': False})
+        self.env.ref('ordertech_integration.ir_cron_ordertech_order_requests')._trigger()
+        return True
@@ -0,0 +1,236 @@
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from ..tools import metrics
+
+_logger = logging.getLogger(__name__)
+
+JOBS_PROCESSED = metrics.counter(
+    'ordertech_sync_jobs_processed_total', "Sync jobs run, by model, method and result (done, retry, failed, deferred).")
+JOB_BATCH_DURATION = metrics.histogram(
+    'ordertech_sync_job_batch_seconds', "Duration of a batch of sync jobs sharing a model and method.")
+
+MAX_ATTEMPTS = 5
+BATCH_SIZE = 200
+
+# a queued creation pushes the record's latest values, making an update redundant
+SUPERSEDED_BY = {
+    'update_tenant_branch_api': 'create_tenant_branch_api',
+    'update_tenant_customer_api': 'create_tenant_customer_api',
+    'update_tenant_product_api': 'create_tenant_product_api',
+    'update_tenant_categId_api': 'create_tenant_category_api',
+    'update_tenant_addons_group_api': 'create_tenant_addons_group_api',
+    'update_tenant_addon_item_api': 'create_tenant_addon_item_api',
+}
+
+# OrderTech id written by each creation: a record holding one was already
+# created (by a bulk action, the onboarding, the reconciliation or the delta
+# sync) and posting it again would duplicate it remotely
+CREATED_ID_FIELDS = {
+    'create_tenant_branch_api': 'ordertech_tenant_branchId',
+    'create_tenant_customer_api': 'ordertech_customerId',
+    'create_tenant_product_api': 'ordertech_productId',
+    'create_tenant_category_api': 'ordertech_categId',
+    'create_tenant_addons_group_api': 'ordertech_addons_groupId',
+    'create_tenant_addon_item_api': 'ordertech_addons_itemId',
+}
+
+# a record created meanwhile still needs the changes the dropped update held
+UPDATED_BY = {create: update for update, create in SUPERSEDED_BY.items()}
+
+
+class OrderTechSyncJob(models.Model):
+    _name = 'ordertech.sync.job'
+    _description = 'OrderTech Sync Job'
+    _order = 'id'
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Many2oneReference(string='Record ID', model_field='res_model', required=True, readonly=True)
+    method = fields.Char(required=True, readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='pending', required=True, index=True)
+    attempts = fields.Integer(readonly=True)
+    scheduled_at = fields.Datetime(default=fields.Datetime.now, required=True, index=True)
+    last_error = fields.Text(readonly=True)
+
+    @api.model
+    def _enqueue(self, records, method, delay=0):
+        """ Queue ``method`` to be called on ``records`` by the sync cron,
+        at the earliest ``delay`` seconds after commit.
+
+        Requests are only collected per record during the transaction and
+        written to the queue once, right before commit: however many times a
+        record is written, it gets at most one job per method, and an update
+        is dropped when the record's creation is queued as well.
+        """
+        if not records:
+            return
+        pending = self.env.cr.precommit.data.setdefault('ordertech.sync.job', {})
+        if not pending:
+            self.env.cr.precommit.add(self._flush_pending)
+        for record_id in records.ids:
+            pending.setdefault((records._name, record_id), {})[method] = delay
+
+    @api.model
+    def _run_now(self, records, method):
+        """ Call ``method`` on ``records`` right away and return the records
+        that failed, which are queued for the sync cron's retries rather than
+        dropped. """
+        if not records:
+            return records
+        failed = getattr(records, method)()
+        self._enqueue(failed, method)
+        return failed
+
+    def _flush_pending(self):
+        pending = self.env.cr.precommit.data.pop('ordertech.sync.job', {})
+        wanted = [
+            (res_model, res_id, method, delay)
+            for (res_model, res_id), methods in pending.items()
+            for method, delay in methods.items()
+            if SUPERSEDED_BY.get(method) not in methods
+        ]
+        if not wanted:
+            return
+        queued = {
+            (job.res_model, job.res_id, job.method)
+            for job in self.sudo().search_fetch([
+                ('state', '=', 'pending'),
+                ('res_id', 'in', list({res_id for _model, res_id, _method, _delay in wanted})),
+            ], ['res_model', 'res_id', 'method'])
+        }
+        now = fields.Datetime.now()
+        vals_list = [
+            {
+                'res_model': res_model,
+                'res_id': res_id,
+                'method': method,
+                'scheduled_at': now + timedelta(seconds=delay),
+            }
+            for res_model, res_id, method, delay in wanted
+            if (res_model, res_id, method) not in queued
+            and (res_model, res_id, SUPERSEDED_BY.get(method)) not in queued
+        ]
+        if vals_list:
+            self.sudo().create(vals_list)
+            self.env.ref('ordertech_integration.ir_cron_ordertech_sync_jobs').sudo()._trigger(
+                min(vals['scheduled_at'] for vals in vals_list))
+
+    @api.model
+    def _cron_process_jobs(self, batch_size=BATCH_SIZE):
+        jobs = self.search([
+            ('state', '=', 'pending'),
+            ('scheduled_at', '<=', fields.Datetime.now()),
+        ], limit=batch_size)
+        groups = {}
+        for job in jobs:
+            key = (job.res_model, job.method)
+            groups[key] = groups.get(key, self.browse()) | job
+        instance = self.env['ordertech.configration']._get_instance()
+        for group in groups.values():
+            retry_in = instance._ordertech_retry_in() if instance else 0
+            if retry_in:
+                # OrderTech is down: wait for the circuit breaker's probe
+                jobs._defer(retry_in)
+                return True
+            group._run(instance)
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+        if len(jobs) == batch_size:
+            self.env.ref('ordertech_integration.ir_cron_ordertech_sync_jobs')._trigger()
+        return True
+
+    def _run(self, instance=None):
+        res_model, method = self[0].res_model, self[0].method
+        records = self.env[res_model].browse(self.mapped('res_id')).exists()
+        created = records.browse()
+        if method in CREATED_ID_FIELDS:
+            created = records.filtered(CREATED_ID_FIELDS[method])
+            records -= created
+        error = False
+        failed = records.browse()
+        try:
+            with self.env.cr.savepoint(), JOB_BATCH_DURATION.time({'model': res_model, 'method': method}):
+                if records:
+                    failed = getattr(records, method)()
+                if created and method in UPDATED_BY:
+                    failed = failed | getattr(created, UPDATED_BY[method])()
+        except Exception as e:
+            _logger.exception("OrderTech sync job %s on %s failed", method, res_model)
+            failed, error = records | created, str(e)
+        failed_ids = set(failed.ids) if isinstance(failed, models.BaseModel) else set()
+        done_jobs = self.filtered(lambda j: j.res_id not in failed_ids)
+        done_jobs.write({
+            'state': 'done',
+            'last_error': False,
+        })
+        JOBS_PROCESSED.inc({'model': res_model, 'method': method, 'result': 'done'}, len(done_jobs))
+        failed_jobs = self.filtered(lambda j: j.res_id in failed_ids)
+        retry_in = instance._ordertech_retry_in() if instance else 0
+        if retry_in:
+            failed_jobs._defer(retry_in)
+        else:
+            failed_jobs._retry_later(error or "OrderTech rejected the request")
+
+    def _retry_later(self, error):
+        now = fields.Datetime.now()
+        for job in self:
+            attempts = job.attempts + 1
+            state = 'failed' if attempts >= MAX_ATTEMPTS else 'pending'
+            job.write({
+                'attempts': attempts,
+                'last_error': error,
+                'state': state,
+                'scheduled_at': now + timedelta(minutes=2 ** attempts),
+            })
+            JOBS_PROCESSED.inc({
+                'model': job.res_model,
+                'method': job.method,
+                'result': 'failed' if state == 'failed' else 'retry',
+            })
+
+    def _defer(self, seconds):
+        """ Postpone pending jobs while OrderTech is unavailable, without
+        counting it as an attempt. """
+        jobs = self.filtered(lambda j: j.state == 'pending')
+        if not jobs:
+            return
+        scheduled_at = fields.Datetime.now() + timedelta(seconds=seconds)
+        for job in jobs:
+            JOBS_PROCESSED.inc({'model': job.res_model, 'method': job.method, 'result': 'deferred'})
+        jobs.write({
+            'scheduled_at': scheduled_at,
+            'last_error': "OrderTech unavailable (circuit open)",
+        })
+        self.env.ref('ordertech_integration.ir_cron_ordertech_sync_jobs')._trigger(scheduled_at)
+
+    def action_retry(self):
+        self.filtered(lambda j: j.state == 'failed').write({
+            'state': 'pending',
+            'attempts': 0,
+            'scheduled_at': fields.Datetime.now(),
+        })
+        self.env.ref('ordertech_integration.ir_cron_ordertech_sync_jobs')._trigger()
+        return True
+
+    @api.model
+    def _metrics_gauges(self):
+        """ Queue depth, as gauges for ``metrics.render``. """
+        groups = self.sudo()._read_group(
+            [('state', 'in', ('pending', 'failed'))], ['res_model', 'method', 'state'], ['__count'])
+        return [(
+            'ordertech_sync_queue_jobs',
+            "Sync jobs waiting in the queue, by model, method and state.",
+            [({'model': res_model, 'method': method, 'state': state}, count)
+             for res_model, method, state, count in groups],
+        )]
+
+    @api.autovacuum
+    def _gc_done_jobs(self):
+        limit_date = fields.Datetime.now() - timedelta(days=7)
+        self.search([('state', '=', 'done'), ('write_date', '<', limit_date)]).unlink()
@@ -0,0 +1,34 @@
+import hashlib
+import json
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class OrderTechSyncMixin(models.AbstractModel):
+    _name = 'ordertech.sync.mixin'
+    _description = 'OrderTech Synced Record'
+
+    ordertech_payload_hash = fields.Char(string='OrderTech Payload Hash', copy=False, readonly=True)
+
+    @api.model
+    def _ordertech_fingerprint(self, payload):
+        data = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(data.encode()).hexdigest()
+
+    def _ordertech_skip_unchanged(self, calls):
+        """ Filter out the ``(record, method, endpoint, payload)`` calls whose
+        payload is the one OrderTech last accepted for the record. """
+        changed = [
+            call for call in calls
+            if call[0].ordertech_payload_hash != self._ordertech_fingerprint(call[3])
+        ]
+        if len(changed) != len(calls):
+            _logger.debug("OrderTech sync of %s: %s unchanged record(s) skipped", self._name, len(calls) - len(changed))
+        return changed
+
+    def _ordertech_store_fingerprint(self, payload):
+        self.ensure_one()
+        self.sudo().write({'ordertech_payload_hash': self._ordertech_fingerprint(payload)})
@@ -0,0 +1,105 @@
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.osv import expression
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200
+# transactions still running may commit records written before this lag
+SETTLE_DELAY = timedelta(minutes=5)
+
+
+class OrderTechSyncWatermark(models.Model):
+    _name = 'ordertech.sync.watermark'
+    _description = 'OrderTech Sync Watermark'
+    _order = 'tenant, res_model'
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    tenant = fields.Char(string='OrderTech TenantId', required=True, readonly=True)
+    last_write_date = fields.Datetime(string='Synced Up To')
+    last_id = fields.Integer(string='Last Record ID')
+
+    _sql_constraints = [
+        ('model_tenant_uniq', 'unique(res_model, tenant)', "A watermark already exists for this model and tenant."),
+    ]
+
+    @api.model
+    def _get_entities(self):
+        """ ``(model, tenant field path, OrderTech id field, domain, create
+        method, update method)`` of the synced entities, in dependency order. """
+        return [
+            ('pos.category', 'company_id', 'ordertech_categId', [],
+             'create_tenant_category_api', 'update_tenant_categId_api'),
+            ('product.attribute', 'company_id', 'ordertech_addons_groupId', [('is_addons', '=', True)],
+             'create_tenant_addons_group_api', 'update_tenant_addons_group_api'),
+            ('product.attribute.value', 'attribute_id.company_id', 'ordertech_addons_itemId',
+             [('attribute_id.ordertech_addons_groupId', '!=', False)],
+             'create_tenant_addon_item_api', 'update_tenant_addon_item_api'),
+            ('product.template', 'company_id', 'ordertech_productId',
+             [('available_in_pos', '=', True), ('pos_categ_ids.ordertech_categId', '!=', False)],
+             'create_tenant_product_api', 'update_tenant_product_api'),
+            ('res.partner', 'company_id', 'ordertech_customerId',
+             [('customer_rank', '>', 0), ('company_id.ordertech_tenant_branchId', '!=', False)],
+             'create_tenant_customer_api', 'update_tenant_customer_api'),
+        ]
+
+    @api.model
+    def _get(self, res_model, tenant):
+        watermark = self.search([('res_model', '=', res_model), ('tenant', '=', tenant)], limit=1)
+        return watermark or self.create({'res_model': res_model, 'tenant': tenant})
+
+    @api.model
+    def _cron_sync_deltas(self, chunk_size=CHUNK_SIZE):
+        """ Push the records changed since the last run to OrderTech, per
+        entity and tenant, whatever way they were changed.
+
+        Records are read by ``(write_date, id)`` past the watermark in chunks
+        of ``chunk_size``; records without an OrderTech id are created, the
+        others go through the update methods, which skip unchanged payloads.
+        Failures are left to the sync queue and the watermark moves on.
+        """
+        tenants = self.env['res.company'].sudo().search([
+            ('is_restaurant', '=', True),
+            ('ordertech_tenantId', '!=', False),
+        ]).mapped('ordertech_tenantId')
+        cutoff = fields.Datetime.now() - SETTLE_DELAY
+        remaining = False
+        for res_model, tenant_path, id_field, domain, create_method, update_method in self._get_entities():
+            for tenant in tenants:
+                watermark = self._get(res_model, tenant)
+                records = watermark._next_chunk(tenant_path, domain, cutoff, chunk_size)
+                if not records:
+                    continue
+                # syncing writes the records again, read the position first
+                last_write_date, last_id = records[-1].write_date, records[-1].id
+                watermark.write({'last_write_date': last_write_date, 'last_id': last_id})
+                sync_job = self.env['ordertech.sync.job']
+                to_create = records.filtered(lambda r: not r[id_field])
+                for method, batch in ((create_method, to_create), (update_method, records - to_create)):
+                    sync_job._run_now(batch, method)
+                _logger.info(
+                    "OrderTech delta sync of %s for tenant %s: %s record(s) up to %s",
+                    res_model, tenant, len(records), last_write_date,
+                )
+                remaining = remaining or len(records) == chunk_size
+                if not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+        if remaining:
+            self.env.ref('ordertech_integration.ir_cron_ordertech_delta_sync')._trigger()
+        return True
+
+    def _next_chunk(self, tenant_path, domain, cutoff, chunk_size):
+        self.ensure_one()
+        domain = expression.AND([
+            domain,
+            [(f'{tenant_path}.ordertech_tenantId', '=', self.tenant), ('write_date', '<=', cutoff)],
+        ])
+        if self.last_write_date:
+            domain = expression.AND([domain, [
+                '|',
+                ('write_date', '>', self.last_write_date),
+                '&', ('write_date', '=', self.last_write_date), ('id', '>', self.last_id),
+            ]])
+        return self.env[self.res_model].sudo().search(domain, order='write_date, id', limit=chunk_size)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+TRACE_LIFETIME_DAYS = 7
+
+
+class OrderTechTrace(models.Model):
+    _name = 'ordertech.trace'
+    _description = 'OrderTech Request Trace'
+    _order = 'id desc'
+
+    name = fields.Char(string='Route', required=True, readonly=True)
+    status_code = fields.Integer(readonly=True)
+    duration = fields.Float(string='Duration (ms)', readonly=True)
+    sql_count = fields.Integer(string='Queries', readonly=True)
+    spans = fields.Text(readonly=True)
+
+    @api.model
+    def _log(self, trace, status_code):
+        spans = sorted(trace.spans, key=lambda s: s['start'])
+        return self.sudo().create({
+            'name': trace.name,
+            'status_code': status_code,
+            'duration': trace.duration,
+            'sql_count': trace.queries,
+            'spans': "\n".join(
+                "%s%s: %.1f ms%s" % (
+                    "  " * span['depth'], span['name'], span['duration'],
+                    f", {span['sql']} sql" if span['sql'] is not None else "",
+                )
+                for span in spans
+            ),
+        })
+
+    @api.autovacuum
+    def _gc_old_traces(self):
+        limit_date = fields.Datetime.now() - timedelta(days=TRACE_LIFETIME_DAYS)
+        self.search([('create_date', '<', limit_date)]).unlink()
@@ -1,18 +1,16 @@
-import json
 import logging
 
-import requests
-
 from odoo import models, fields, api, _
 
 _logger = logging.getLogger(__name__)
 
 
 class PosCategory(models.Model):
-    _inherit = 'pos.category'
+    _name = 'pos.category'
+    _inherit = ['pos.category', 'ordertech.sync.mixin']
 
     company_id = fields.Many2one('res.company', default=lambda self: self.env.company.id, index=True)
-    ordertech_categId = fields.Char()
+    ordertech_categId = fields.Char(index='btree_not_null')
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -21,34 +19,41 @@ class PosCategory(models.Model):
             lambda c: c.company_id and c.company_id.ordertech_tenantId
         )
         if ordertech_categories:
-            ordertech_categories.create_tenant_category_api()
+            self.env['ordertech.sync.job']._enqueue(ordertech_categories, 'create_tenant_category_api')
 
         return categroies
 
+    def _prepare_ordertech_payloads(self):
+        slugify = self.env['ir.http']._slugify
+        names_en = self.with_context(lang="en_US").mapped('name')
+        names_ar = self.with_context(lang="ar_001").mapped('name')
+        return {
+            categ: {
+                "name_en": name_en,
+                "name_ar": name_ar,
+                "slug": slugify(categ.name),
+                "is_active": True,
+                "sort_order": 0
+            }
+            for categ, name_en, name_ar in zip(self, names_en, names_ar)
+        }
+
     def create_tenant_category_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance missing, branch sync skipped.")
-            return False
-        for categ in self:
-            url = f"{instance.url}/api/menu/categories/{categ.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(categ.name)
-            payload = json.dumps({
-                "name_en": categ.with_context(lang="en_US").name,
-                "name_ar": categ.with_context(lang="ar_001").name,
-                "slug": slug,
-                "is_active": True,
-                "sort_order": 0
-            })
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = [
+            (categ, "POST", f"/api/menu/categories/{categ.company_id.ordertech_tenantId}", payloads[categ])
+            for categ in self
+        ]
+        failed = self.browse()
+        for categ, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= categ
                     _logger.error(
                         "OrderTech tenant category sync failed for category %s: %s ",
                         categ.id, response.text,
@@ -58,13 +63,16 @@ class PosCategory(models.Model):
                 categ.sudo().write({
                     'ordertech_categId': data['id'],
                 })
+                categ._ordertech_store_fingerprint(payloads[categ])
                 _logger.info("Successfully synced category data for category %s", categ.id)
             except Exception as e:
+                failed |= categ
                 _logger.error(
                     "OrderTech API request error for categ %s: %s",
                     categ.id,
                     str(e),
                 )
+        return failed
 
     def write(self, vals):
         res = super(PosCategory, self).write(vals)
@@ -73,51 +81,45 @@ class PosCategory(models.Model):
                 lambda c: c.ordertech_categId  and c.company_id.ordertech_tenantId
             )
             if categories:
-                categories.update_tenant_categId_api()
+                self.env['ordertech.sync.job']._enqueue(categories, 'update_tenant_categId_api')
         return res
 
     def update_tenant_categId_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
-        for categ in self:
-            url = f"{instance.url}/api/menu/categories/{categ.ordertech_categId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(categ.name)
-            payload = json.dumps({
-                "name_en": categ.with_context(lang="en_US").name,
-                "name_ar": categ.with_context(lang="ar_001").name,
-                "slug": slug,
-                "is_active": True,
-                "sort_order": 0
-            })
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = self._ordertech_skip_unchanged([
+            (categ, "PUT", f"/api/menu/categories/{categ.ordertech_categId}", payloads[categ])
+            for categ in self
+        ])
+        failed = self.browse()
+        for categ, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= categ
                     _logger.error(
                         "OrderTech tenant category sync failed for category %s: %s ",
                         categ.id, response.text,
                     )
                     continue
+                categ._ordertech_store_fingerprint(payloads[categ])
                 _logger.info("Successfully synced category update data for category %s", categ.id)
             except Exception as e:
+                failed |= categ
                 _logger.error(
                     "OrderTech API request error for category %s: %s",
                     categ.id,
                     str(e),
                 )
-        return True
+        return failed
 
     def action_sync_category_to_ordertech(self):
         ordertech_categories = self.filtered(
             lambda c: c.company_id and c.company_id.ordertech_tenantId and not c.ordertech_categId
         )
         if ordertech_categories:
-            ordertech_categories.create_tenant_category_api()
+            self.env['ordertech.sync.job']._run_now(ordertech_categories, 'create_tenant_category_api')
         return True
\ No newline at end of file
@@ -0,0 +1,36 @@
+from odoo import fields, models
+
+
+class PosConfig(models.Model):
+    _inherit = 'pos.config'
+
+    ordertech_sequence_id = fields.Many2one('ir.sequence', string='OrderTech Order Sequence', copy=False, readonly=True)
+
+    def write(self, vals):
+        res = super(PosConfig, self).write(vals)
+        if 'picking_type_id' in vals:
+            # picking type of the branches' order ingestion context
+            self.env.registry.clear_cache()
+        return res
+
+    def _ordertech_next_sequence_number(self):
+        """ Allocate the sequence number of an OrderTech order placed on this
+        point of sale.
+
+        Numbers come from a PostgreSQL sequence (``standard`` implementation),
+        so allocation is O(1), takes no row lock and never returns the same
+        number to concurrent requests. It starts above the numbers already used
+        on the point of sale when it is created.
+        """
+        self.ensure_one()
+        if not self.ordertech_sequence_id:
+            last_order = self.env['pos.order'].sudo().search(
+                [('config_id', '=', self.id)], order='sequence_number desc', limit=1)
+            self.sudo().ordertech_sequence_id = self.env['ir.sequence'].sudo().create({
+                'name': f"OrderTech Orders - {self.name}",
+                'implementation': 'standard',
+                'number_next': last_order.sequence_number + 1,
+                'number_increment': 1,
+                'company_id': self.company_id.id,
+            })
+        return int(self.ordertech_sequence_id.sudo()._next())
@@ -1,8 +1,209 @@
-from  odoo import models, fields, api
+import logging
+from uuid import uuid4
 
+from  odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+from odoo.tools import frozendict
 
+from ..controllers.general_functions import generate_unique_id
+from ..tools import tracing
+
+_logger = logging.getLogger(__name__)
+
+# statuses set within this many seconds are sent to OrderTech as the last one
+STATUS_DEBOUNCE_SECONDS = 5
 
 class PosOrder(models.Model):
     _inherit = 'pos.order'
 
-    ordertech_orderId = fields.Char()
\ No newline at end of file
+    ordertech_orderId = fields.Char(index='btree_not_null')
+    ordertech_status = fields.Char(string='OrderTech Status', readonly=True, copy=False)
+    ordertech_status_sent = fields.Char(string='OrderTech Status Sent', readonly=True, copy=False)
+
+    def write(self, vals):
+        self.env['ordertech.id.registry']._invalidate(self, vals)
+        return super(PosOrder, self).write(vals)
+
+    def unlink(self):
+        self.env['ordertech.id.registry']._invalidate(self)
+        return super(PosOrder, self).unlink()
+
+    @api.model
+    @tools.ormcache('branch_id')
+    def _ordertech_ingestion_context(self, branch_id):
+        """ Return the ids orders of the OrderTech branch ``branch_id`` are
+        created with: company, open session (and its user), point of sale and
+        picking type.
+
+        The context is kept in the worker's cache and cleared when a session
+        changes state, or a point of sale its picking type. A branch without an
+        open session raises and is therefore never cached.
+        """
+        company_id = self.env['ordertech.id.registry'].sudo()._resolve('res.company', branch_id)
+        if not company_id:
+            raise ValidationError(f"Company not found with this id : {branch_id}")
+        session = self.env['pos.session'].sudo().search([
+            ('state', '=', 'opened'),
+            ('company_id', '=', company_id.id)
+        ], limit=1)
+        if not session:
+            raise ValidationError("No open POS session")
+        return frozendict({
+            'company_id': company_id.id,
+            'session_id': session.id,
+            'user_id': session.user_id.id,
+            'config_id': session.config_id.id,
+            'picking_type_id': session.config_id.picking_type_id.id,
+        })
+
+    @api.model
+    def _ordertech_prepare_line(self, line_vals):
+        registry = self.env['ordertech.id.registry'].sudo()
+        with tracing.span('product'):
+            product_tmpl_id = registry._resolve('product.template', line_vals.get('product_id'))
+            if not product_tmpl_id:
+                raise ValidationError(f"Product not found with this id : {line_vals.get('product_id')}")
+            product_id = product_tmpl_id.product_variant_id
+        with tracing.span('attributes'):
+            addons, sizes = product_tmpl_id._get_ordertech_attribute_index(product_tmpl_id.id)
+        value_ids = []
+        price_extra = 0
+        for val in line_vals.get('attributes') or []:
+            value = addons.get((val.get('group_id'), val.get('item_id')))
+            if not value:
+                raise ValidationError(
+                    f"Not found addons group_id: {val.get('group_id')} or item_id: {val.get('item_id')}"
+                )
+            value_ids.append(value[0])
+            price_extra += value[1]
+
+        if line_vals.get("size_value"):
+            value = sizes.get(line_vals['size_value'].strip().lower())
+            if not value:
+                raise ValidationError(f"Size value {line_vals['size_value']} not found")
+            value_ids.append(value[0])
+            price_extra += value[1]
+
+        try:
+            qty = float(line_vals.get('qty') or 0)
+        except (TypeError, ValueError):
+            qty = 0
+        if qty <= 0:
+            raise ValidationError("Invalid qty value must be greater than 0")
+        price_unit = product_id.lst_price + price_extra
+        return (0, 0, {
+            'product_id': product_id.id,
+            'qty': qty,
+            'price_unit': price_unit,
+            'price_extra': price_extra,
+            'price_subtotal': qty * price_unit,
+            'price_subtotal_incl': qty * price_unit,
+            'uuid': str(uuid4()),
+            'attribute_value_ids': [(6, 0, value_ids)],
+        })
+
+    @api.model
+    def _ordertech_prepare_order(self, vals, context):
+        """ Build the ``_process_order`` data of an OrderTech order. Its lines
+        are given in ``lines``, or inline (``product_id``, ``qty``,
+        ``attributes``, ``size_value``) for a single-line order; ``context``
+        is the branch's ``_ordertech_ingestion_context``. """
+        with tracing.span('partner'):
+            partner_id = self.env['ordertech.id.registry'].sudo()._resolve('res.partner', vals.get('customer_id'))
+        if not partner_id:
+            raise ValidationError(f"Customer not found with this id : {vals.get('customer_id')}")
+        lines = vals.get('lines') or [vals]
+        with tracing.span('lines'):
+            order_lines = [self._ordertech_prepare_line(line) for line in lines]
+        config = self.env['pos.config'].browse(context['config_id'])
+        with tracing.span('generate_unique_id'):
+            uniq_id = generate_unique_id(context['session_id'], context['user_id'], config)
+        return {
+            'session_id': context['session_id'],
+            'company_id': context['company_id'],
+            'config_id': context['config_id'],
+            'picking_type_id': context['picking_type_id'],
+            'sequence_number': int(uniq_id.split('-')[-1]),
+            'uuid': str(uuid4()),
+            'name': f"Order {uniq_id}",
+            'state': 'draft',
+            'partner_id': partner_id.id,
+            'amount_paid': 0.0,
+            'amount_tax': 0.0,
+            'amount_total': 0.0,
+            'amount_return': 0.0,
+            'general_note': 'OrderTech',
+            'ordertech_orderId': vals.get('ordertech_orderId'),
+            'lines': order_lines,
+        }
+
+    @api.model
+    def _ordertech_create_order(self, vals):
+        with tracing.span('ingestion_context'):
+            context = self._ordertech_ingestion_context(str(vals['company_id']))
+        with tracing.span('prepare_order'):
+            order_data = self._ordertech_prepare_order(vals, context)
+        pos_order = self.sudo()
+        with tracing.span('process_order'):
+            order = pos_order.browse(pos_order._process_order(order_data, False))
+        with tracing.span('compute_prices'):
+            order._compute_prices()
+        return order
+
+    def _ordertech_response_data(self):
+        self.ensure_one()
+        return {
+            'orderId': self.id,
+            'order_number': self.tracking_number,
+            'receipt_number': self.pos_reference,
+            'status': self.state,
+        }
+
+    def _ordertech_set_status(self, status):
+        """ Record the kitchen status of the OrderTech orders in ``self`` and
+        queue its notification to OrderTech.
+
+        Only the status is stored here; the queued job sends the order's status
+        at the time it runs, after commit. Transitions superseded within the
+        same transaction or the debounce window are never sent, and neither is
+        a status OrderTech was already told about.
+        """
+        orders = self.filtered(lambda o: o.ordertech_orderId and o.ordertech_status != status)
+        if orders:
+            orders.sudo().write({'ordertech_status': status})
+            self.env['ordertech.sync.job']._enqueue(
+                orders, '_ordertech_send_order_status', delay=STATUS_DEBOUNCE_SECONDS)
+
+    def _ordertech_send_order_status(self):
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            _logger.error("OrderTech instance missing, order status sync skipped.")
+            return self
+        calls = [
+            (order, "POST", "/api/integrations/odoo/webhook/order-status", {
+                "order_id": order.ordertech_orderId,
+                "status": order.ordertech_status,
+            })
+            for order in self.filtered(lambda o: o.ordertech_status and o.ordertech_status != o.ordertech_status_sent)
+        ]
+        failed = self.browse()
+        for order, result in instance._ordertech_dispatch(calls):
+            try:
+                response = result()
+                if response.status_code != 201:
+                    failed |= order
+                    _logger.error(
+                        "OrderTech update order status failed for order %s: %s ",
+                        order.id, response.text,
+                    )
+                    continue
+                order.sudo().ordertech_status_sent = order.ordertech_status
+                _logger.info("Successfully update order status for order %s", order.id)
+            except Exception as e:
+                failed |= order
+                _logger.error(
+                    "OrderTech API request error for order %s: %s",
+                    order.id,
+                    str(e),
+                )
+        return failed
@@ -0,0 +1,16 @@
+from odoo import models
+
+
+class PosSession(models.Model):
+    _inherit = 'pos.session'
+
+    def write(self, vals):
+        res = super(PosSession, self).write(vals)
+        if {'state', 'user_id'} & vals.keys():
+            # sessions of the branches' order ingestion context
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super(PosSession, self).unlink()
@@ -1,8 +1,5 @@
-import json
 import logging
 
-import requests
-
 from odoo import api, fields, models
 
 _logger = logging.getLogger(__name__)
@@ -15,14 +12,15 @@ ATTRIBUTE_TRACKED_FIELDS ={
 }
 
 class ProductAttribute(models.Model):
-    _inherit = "product.attribute"
+    _name = 'product.attribute'
+    _inherit = ['product.attribute', 'ordertech.sync.mixin']
 
     company_id = fields.Many2one('res.company', default=lambda self: self.env.company.id)
     is_addons = fields.Boolean(string="Is Add-ons Group")
     limit_min = fields.Integer()
     limit_max = fields.Integer()
     is_required = fields.Boolean()
-    ordertech_addons_groupId = fields.Char()
+    ordertech_addons_groupId = fields.Char(index='btree_not_null')
 
     @api.onchange("is_addons")
     def _check_is_addons_group(self):
@@ -37,35 +35,42 @@ class ProductAttribute(models.Model):
             lambda attr: attr.company_id and attr.company_id.ordertech_tenantId and attr.is_addons
         )
         if ordertech_attrs:
-            ordertech_attrs.create_tenant_addons_group_api()
+            self.env['ordertech.sync.job']._enqueue(ordertech_attrs, 'create_tenant_addons_group_api')
         return attributes
 
-    def create_tenant_addons_group_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
-        if not instance or not instance.ordertech_token:
-            _logger.error("OrderTech instance missing, addons-group sync skipped.")
-            return False
-        for attr in self:
-            url = f"{instance.url}/api/menu/addon-groups/{attr.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(attr.name)
-            payload = json.dumps({
-                "name_en": attr.with_context(lang="en_US").name,
-                "name_ar": attr.with_context(lang="ar_001").name,
-                "slug": slug,
+    def _prepare_ordertech_payloads(self):
+        slugify = self.env['ir.http']._slugify
+        names_en = self.with_context(lang="en_US").mapped('name')
+        names_ar = self.with_context(lang="ar_001").mapped('name')
+        return {
+            attr: {
+                "name_en": name_en,
+                "name_ar": name_ar,
+                "slug": slugify(attr.name),
                 "limit_min": attr.limit_min,
                 "limit_max": attr.limit_max,
                 "is_required": attr.is_required,
                 "sort_order": 0
-            })
+            }
+            for attr, name_en, name_ar in zip(self, names_en, names_ar)
+        }
+
+    def create_tenant_addons_group_api(self):
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            _logger.error("OrderTech instance missing, addons-group sync skipped.")
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = [
+            (attr, "POST", f"/api/menu/addon-groups/{attr.company_id.ordertech_tenantId}", payloads[attr])
+            for attr in self
+        ]
+        failed = self.browse()
+        for attr, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= attr
                     _logger.error(
                         "OrderTech tenant addon-group sync failed for addon-group %s: %s ",
                         attr.id, response.text,
@@ -75,72 +80,71 @@ class ProductAttribute(models.Model):
                 attr.sudo().write({
                     'ordertech_addons_groupId': data['id'],
                 })
+                attr._ordertech_store_fingerprint(payloads[attr])
                 _logger.info("Successfully synced addon-group data for addon-group %s", attr.id)
             except Exception as e:
+                failed |= attr
                 _logger.error(
                     "OrderTech API request error for addon-group %s: %s",
                     attr.id,
                     str(e),
                 )
+        return failed
 
     def write(self, vals):
         trigger_update_attr = bool(ATTRIBUTE_TRACKED_FIELDS & vals.keys())
         res = super(ProductAttribute, self).write(vals)
+        if 'ordertech_addons_groupId' in vals:
+            # keys of the product templates' add-on index
+            self.env.registry.clear_cache()
         if trigger_update_attr:
             attributes = self.filtered(
                 lambda attr: attr.ordertech_addons_groupId and attr.company_id.ordertech_tenantId and attr.is_addons
             )
             if attributes:
-                attributes.update_tenant_addons_group_api()
+                self.env['ordertech.sync.job']._enqueue(attributes, 'update_tenant_addons_group_api')
         return res
 
     def update_tenant_addons_group_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
-        for attr in self:
-            url = f"{instance.url}/api/menu/addon-groups/{attr.ordertech_addons_groupId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(attr.name)
-            payload = json.dumps({
-                "name_en": attr.with_context(lang="en_US").name,
-                "name_ar": attr.with_context(lang="ar_001").name,
-                "slug": slug,
-                "limit_min": attr.limit_min,
-                "limit_max": attr.limit_max,
-                "is_required": attr.is_required,
-                "sort_order": 0
-            })
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = self._ordertech_skip_unchanged([
+            (attr, "PUT", f"/api/menu/addon-groups/{attr.ordertech_addons_groupId}", payloads[attr])
+            for attr in self
+        ])
+        failed = self.browse()
+        for attr, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= attr
                     _logger.error(
                         "OrderTech tenant addons-group sync failed for addons-group %s: %s ",
                         attr.id, response.text,
                     )
                     continue
+                attr._ordertech_store_fingerprint(payloads[attr])
                 _logger.info("Successfully synced addons-group update data for addons-group %s", attr.id)
             except Exception as e:
+                failed |= attr
                 _logger.error(
                     "OrderTech API request error for addons-group %s: %s",
                     attr.id,
                     str(e),
                 )
-        return True
+        return failed
 
     def action_sync_groups_to_ordertech(self):
         ordertech_attrs = self.filtered(
             lambda attr: attr.company_id and attr.company_id.ordertech_tenantId and attr.is_addons and not attr.ordertech_addons_groupId
         )
         if ordertech_attrs:
-            ordertech_attrs.create_tenant_addons_group_api()
-            if ordertech_attrs.value_ids:
-                for value in ordertech_attrs.value_ids:
-                    value.create_tenant_addon_item_api()
+            sync_job = self.env['ordertech.sync.job']
+            sync_job._run_now(ordertech_attrs, 'create_tenant_addons_group_api')
+            sync_job._run_now(ordertech_attrs.value_ids.filtered(
+                lambda item: item.attribute_id.ordertech_addons_groupId and not item.ordertech_addons_itemId
+            ), 'create_tenant_addon_item_api')
         return True
\ No newline at end of file
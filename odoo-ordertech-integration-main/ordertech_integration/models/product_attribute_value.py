@@ -1,18 +1,16 @@
-import json
 import logging
 import typing
 
-import requests
-
 from odoo import api, fields, models
 from odoo.api import ValuesType
 
 _logger = logging.getLogger(__name__)
 
 class ProductAttributeValue(models.Model):
-    _inherit = 'product.attribute.value'
+    _name = 'product.attribute.value'
+    _inherit = ['product.attribute.value', 'ordertech.sync.mixin']
 
-    ordertech_addons_itemId = fields.Char()
+    ordertech_addons_itemId = fields.Char(index='btree_not_null')
 
 
     @api.model_create_multi
@@ -22,32 +20,40 @@ class ProductAttributeValue(models.Model):
             lambda item: item.attribute_id.ordertech_addons_groupId
         )
         if ordertech_items:
-            ordertech_items.create_tenant_addon_item_api()
+            self.env['ordertech.sync.job']._enqueue(ordertech_items, 'create_tenant_addon_item_api')
         return values
 
-    def create_tenant_addon_item_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
-        if not instance or not instance.ordertech_token:
-            _logger.error("OrderTech instance missing, addons-item sync skipped.")
-            return False
-        for item in self:
-            url = f"{instance.url}/api/menu/addon-items/{item.attribute_id.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
-                "name_en": item.with_context(lang="en_US").name,
-                "name_ar": item.with_context(lang="ar_001").name,
-                "group_id": item.attribute_id.ordertech_addons_groupId,
+    def _prepare_ordertech_payloads(self):
+        names_en = self.with_context(lang="en_US").mapped('name')
+        names_ar = self.with_context(lang="ar_001").mapped('name')
+        return {
+            item: {
+                "name_en": name_en,
+                "name_ar": name_ar,
                 "price_cents_base": item.default_extra_price,
                 "is_active": True,
                 "sort_order": 0
-            })
+            }
+            for item, name_en, name_ar in zip(self, names_en, names_ar)
+        }
+
+    def create_tenant_addon_item_api(self):
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            _logger.error("OrderTech instance missing, addons-item sync skipped.")
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = [
+            (item, "POST", f"/api/menu/addon-items/{item.attribute_id.company_id.ordertech_tenantId}",
+             dict(payloads[item], group_id=item.attribute_id.ordertech_addons_groupId))
+            for item in self
+        ]
+        failed = self.browse()
+        for item, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= item
                     _logger.error(
                         "OrderTech tenant addon-item sync failed for addon-item %s: %s ",
                         item.id, response.text,
@@ -58,56 +64,58 @@ class ProductAttributeValue(models.Model):
                     item.sudo().write({
                         'ordertech_addons_itemId': data['items'][0]['id'],
                     })
+                item._ordertech_store_fingerprint(payloads[item])
                 _logger.info("Successfully synced addon-item data for addon-item %s", item.id)
             except Exception as e:
+                failed |= item
                 _logger.error(
                     "OrderTech API request error for addon-item %s: %s",
                     item.id,
                     str(e),
                 )
+        return failed
 
     def write(self, vals):
         res = super(ProductAttributeValue, self).write(vals)
+        if {'name', 'ordertech_addons_itemId'} & vals.keys():
+            # keys of the product templates' add-on/size index
+            self.env.registry.clear_cache()
         if any(k in vals for k in ('name', 'default_extra_price')):
             values = self.filtered(
                 lambda item: item.ordertech_addons_itemId
             )
             if values:
-                values.update_tenant_addon_item_api()
+                self.env['ordertech.sync.job']._enqueue(values, 'update_tenant_addon_item_api')
         return res
 
     def update_tenant_addon_item_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
-        for item in self:
-            url = f"{instance.url}/api/menu/addon-items/{item.ordertech_addons_itemId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
-                "name_en": item.with_context(lang="en_US").name,
-                "name_ar": item.with_context(lang="ar_001").name,
-                "price_cents_base": item.default_extra_price,
-                "is_active": True,
-                "sort_order": 0
-            })
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = self._ordertech_skip_unchanged([
+            (item, "PUT", f"/api/menu/addon-items/{item.ordertech_addons_itemId}", payloads[item])
+            for item in self
+        ])
+        failed = self.browse()
+        for item, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= item
                     _logger.error(
                         "OrderTech tenant addons-item sync failed for addons-item %s: %s ",
                         item.id, response.text,
                     )
                     continue
+                item._ordertech_store_fingerprint(payloads[item])
                 _logger.info("Successfully synced addons-item update data for addons-item %s", item.id)
             except Exception as e:
+                failed |= item
                 _logger.error(
                     "OrderTech API request error for addons_item %s: %s",
                     item.id,
                     str(e),
                 )
-        return True
\ No newline at end of file
+        return failed
\ No newline at end of file
@@ -1,9 +1,8 @@
-import json
 import logging
+from collections import defaultdict
 
-import requests
-from odoo import api, fields, models, SUPERUSER_ID
-from odoo.http import request
+from odoo import api, fields, models, tools, SUPERUSER_ID
+from odoo.tools import frozendict
 
 _logger = logging.getLogger(__name__)
 
@@ -17,9 +16,10 @@ PRODUCT_TRACKED_FIELDS = {
 }
 
 class ProductTemplate(models.Model):
-    _inherit = 'product.template'
+    _name = 'product.template'
+    _inherit = ['product.template', 'ordertech.sync.mixin']
 
-    ordertech_productId = fields.Char()
+    ordertech_productId = fields.Char(index='btree_not_null')
 
     def default_get(self, default_fields):
         defaults = super().default_get(default_fields)
@@ -38,56 +38,93 @@ class ProductTemplate(models.Model):
             )
         )
         if ordertech_product:
-            ordertech_product.create_tenant_product_api()
+            self.env['ordertech.sync.job']._enqueue(ordertech_product, 'create_tenant_product_api')
         return products
 
-    def create_tenant_product_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
-        if not instance or not instance.ordertech_token:
-            _logger.error("OrderTech instance missing, product sync skipped.")
-            return False
-        for product in self:
-            url = f"{instance.url}/api/menu/products/{product.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(product.name)
-            base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-            img_url = f"{base_url}/web/image/product.template/{product.id}/image_1920" if product.image_1920 else None
-            payload = json.dumps({
-                "name_en": product.with_context(lang="en_US").name,
-                "name_ar": product.with_context(lang="ar_001").name,
-                "slug": slug,
+    def _prepare_ordertech_payloads(self):
+        """ Return the OrderTech payload of each product, keyed by record.
+
+        The whole recordset is serialized with a constant number of queries:
+        names are read once per language, the sizes attribute and base URL
+        are resolved once, and image checksums and attribute lines are
+        fetched together, then grouped per template.
+
+        The image URL carries the image checksum, so that replacing the image
+        changes the payload (and its fingerprint) and OrderTech reloads it.
+        """
+        slugify = self.env['ir.http']._slugify
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        ot_sizes_attribute = self.env.ref("ordertech_integration.ordertech_product_sizes_attribute",
+                                          raise_if_not_found=False)
+        names_en = self.with_context(lang="en_US").mapped('name')
+        names_ar = self.with_context(lang="ar_001").mapped('name')
+        checksums = {
+            attachment.res_id: attachment.checksum
+            for attachment in self.env['ir.attachment'].sudo().search([
+                ('res_model', '=', 'product.template'),
+                ('res_field', '=', 'image_1920'),
+                ('res_id', 'in', self.ids),
+            ])
+        }
+        lines_by_product = defaultdict(list)
+        for line in self.attribute_line_ids:
+            lines_by_product[line.product_tmpl_id.id].append(line)
+
+        payloads = {}
+        for product, name_en, name_ar in zip(self, names_en, names_ar):
+            checksum = checksums.get(product.id)
+            lines = lines_by_product[product.id]
+            payload = {
+                "name_en": name_en,
+                "name_ar": name_ar,
+                "slug": slugify(product.name),
                 "sku": product.default_code,
-                "category_id": product.pos_categ_ids.filtered(lambda c: c.ordertech_categId)[0].ordertech_categId,
-                "image_url": img_url,
+                "category_id": product.pos_categ_ids.filtered('ordertech_categId')[:1].ordertech_categId or None,
+                "image_url": f"{base_url}/web/image/product.template/{product.id}/image_1920?unique={checksum}"
+                             if checksum else None,
                 "is_active": True,
                 "has_sizes": False,
                 "has_addons": False,
                 "sort_order": 0,
-                # "sizes": [
-                #     {
-                #         "name_en": "string",
-                #         "name_ar": "string",
-                #         "size_code": "string",
-                #         "price_cents_base": 0,
-                #         "sort_order": 0
-                #     }
-                # ],
-                # "addon_groups": [
-                #     {
-                #         "addon_group_id": "string",
-                #         "sort_order": 0
-                #     }
-                # ],
                 "base_price_cents": product.list_price
-            })
+            }
+            size_lines = [l for l in lines if ot_sizes_attribute and l.attribute_id == ot_sizes_attribute]
+            if size_lines:
+                payload.update({
+                    "has_sizes": True,
+                    "sizes": [{
+                        "name_en": value.name,
+                        "price_cents_base": value.default_extra_price + product.list_price
+                    } for line in size_lines for value in line.value_ids]
+                })
+            addon_lines = [l for l in lines if l.attribute_id.is_addons and l.attribute_id.ordertech_addons_groupId]
+            if addon_lines:
+                payload.update({
+                    "has_addons": True,
+                    "addon_groups": [{
+                        "addon_group_id": line.attribute_id.ordertech_addons_groupId,
+                        "sort_order": 0
+                    } for line in addon_lines]
+                })
+            payloads[product] = payload
+        return payloads
+
+    def create_tenant_product_api(self):
+        instance = self.env['ordertech.configration']._get_instance()
+        if not instance or not instance.ordertech_token:
+            _logger.error("OrderTech instance missing, product sync skipped.")
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = [
+            (product, "POST", f"/api/menu/products/{product.company_id.ordertech_tenantId}", payloads[product])
+            for product in self
+        ]
+        failed = self.browse()
+        for product, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= product
                     _logger.error(
                         "OrderTech tenant product sync failed for product %s: %s ",
                         product.id, response.text,
@@ -97,16 +134,20 @@ class ProductTemplate(models.Model):
                 product.with_user(SUPERUSER_ID).write({
                     'ordertech_productId': data['id'],
                 })
+                product._ordertech_store_fingerprint(payloads[product])
                 _logger.info("Successfully synced product data for product %s", product.id)
             except Exception as e:
+                failed |= product
                 _logger.error(
                     "OrderTech API request error for product %s: %s",
                     product.id,
                     str(e),
                 )
+        return failed
 
     def write(self, vals):
         trigger_update_pro = bool(PRODUCT_TRACKED_FIELDS & vals.keys())
+        self.env['ordertech.id.registry']._invalidate(self, vals)
         res = super(ProductTemplate, self).write(vals)
         if trigger_update_pro:
             products = self.filtered(
@@ -118,86 +159,68 @@ class ProductTemplate(models.Model):
                 )
             )
             if products:
-                products.update_tenant_product_api()
+                self.env['ordertech.sync.job']._enqueue(products, 'update_tenant_product_api')
         return res
 
+    def unlink(self):
+        self.env['ordertech.id.registry']._invalidate(self)
+        return super(ProductTemplate, self).unlink()
+
+    @api.model
+    @tools.ormcache('tmpl_id')
+    def _get_ordertech_attribute_index(self, tmpl_id):
+        """ Return ``(addons, sizes)`` for the template: its add-on values keyed
+        by OrderTech ``(group_id, item_id)`` and its size values keyed by
+        normalized name, both mapping to ``(ptav_id, price_extra)``.
+
+        Cached per worker; cleared whenever template attribute values or the
+        OrderTech ids and names they are keyed on change.
+        """
+        ot_sizes_attribute = self.env.ref("ordertech_integration.ordertech_product_sizes_attribute",
+                                          raise_if_not_found=False)
+        tmpl_values = self.env['product.template.attribute.value'].sudo().search([('product_tmpl_id', '=', tmpl_id)])
+        addons, sizes = {}, {}
+        for value in tmpl_values:
+            entry = (value.id, value.price_extra)
+            if ot_sizes_attribute and value.attribute_id == ot_sizes_attribute:
+                sizes[value.name.strip().lower()] = entry
+            group_id = value.attribute_id.ordertech_addons_groupId
+            item_id = value.product_attribute_value_id.ordertech_addons_itemId
+            if group_id and item_id:
+                addons[(group_id, item_id)] = entry
+        return frozendict(addons), frozendict(sizes)
+
     def update_tenant_product_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
-        for product in self:
-            url = f"{instance.url}/api/menu/products/{product.ordertech_productId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            slugify = self.env['ir.http']._slugify
-            slug = slugify(product.name)
-            base_url = request.env['ir.config_parameter'].sudo().get_param('web.base.url')
-            img_url = f"{base_url}/web/image/product.template/{product.id}/image_1920" if product.image_128 else None
-            payload = {
-                "name_en": product.with_context(lang="en_US").name,
-                "name_ar": product.with_context(lang="ar_001").name,
-                "slug": slug,
-                "sku": product.default_code,
-                "category_id": product.pos_categ_ids.filtered(lambda c: c.ordertech_categId)[0].ordertech_categId,
-                "image_url": img_url,
-                "is_active": True,
-                "has_sizes": False,
-                "has_addons": False,
-                "sort_order": 0,
-                "base_price_cents": product.list_price
-            }
-            ot_sizes_attribute = self.env.ref("ordertech_integration.ordertech_product_sizes_attribute")
-            if ot_sizes_attribute:
-                size_att =  product.attribute_line_ids.filtered(
-                    lambda l: l.attribute_id.id == ot_sizes_attribute.id
-                )
-                if size_att:
-                    sizes = []
-                    for value in size_att.value_ids:
-                        sizes.append({
-                            "name_en":value.name,
-                            "price_cents_base": value.default_extra_price + product.list_price
-                        })
-                    payload.update({
-                        "has_sizes": True,
-                        "sizes": sizes
-                    })
-
-            ordertech_attributes = product.attribute_line_ids.filtered(
-                lambda l: l.attribute_id.is_addons and l.attribute_id.ordertech_addons_groupId
-            )
-            if ordertech_attributes:
-                addon_groups = []
-                for line in ordertech_attributes:
-                    addon_groups.append({
-                        "addon_group_id": line.attribute_id.ordertech_addons_groupId,
-                        "sort_order": 0
-                    })
-                payload.update({
-                    "has_addons": True,
-                    "addon_groups": addon_groups
-                })
-
+            return self
+        payloads = self._prepare_ordertech_payloads()
+        calls = self._ordertech_skip_unchanged([
+            (product, "PUT", f"/api/menu/products/{product.ordertech_productId}", payloads[product])
+            for product in self
+        ])
+        failed = self.browse()
+        for product, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, json=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= product
                     _logger.error(
                         "OrderTech tenant product sync failed for product %s: %s ",
                         product.id, response.text,
                     )
                     continue
+                product._ordertech_store_fingerprint(payloads[product])
                 _logger.info("Successfully synced product update data for product %s", product.id)
             except Exception as e:
+                failed |= product
                 _logger.error(
                     "OrderTech API request error for product %s: %s",
                     product.id,
                     str(e),
                 )
-        return True
+        return failed
 
     def action_sync_products_to_ordertech(self):
         ordertech_product = self.filtered(
@@ -209,6 +232,5 @@ class ProductTemplate(models.Model):
             )
         )
         if ordertech_product:
-            ordertech_product.create_tenant_product_api()
-            ordertech_product.update_tenant_product_api()
+            self.env['ordertech.sync.job']._run_now(ordertech_product, 'create_tenant_product_api')
         return True
\ No newline at end of file
@@ -0,0 +1,20 @@
+from odoo import api, models
+
+
+class ProductTemplateAttributeValue(models.Model):
+    _inherit = 'product.template.attribute.value'
+
+    # any change may alter ProductTemplate._get_ordertech_attribute_index()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super(ProductTemplateAttributeValue, self).create(vals_list)
+
+    def write(self, vals):
+        self.env.registry.clear_cache()
+        return super(ProductTemplateAttributeValue, self).write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super(ProductTemplateAttributeValue, self).unlink()
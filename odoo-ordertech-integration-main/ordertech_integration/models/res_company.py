@@ -1,4 +1,3 @@
-import json
 import logging
 
 import requests
@@ -38,10 +37,15 @@ class ResCompany(models.Model):
     is_branch = fields.Boolean()
     opening_time = fields.Float()
     closing_time = fields.Float()
-    ordertech_tenantId = fields.Char()
-    ordertech_tenant_branchId = fields.Char()
+    ordertech_tenantId = fields.Char(index='btree_not_null')
+    ordertech_tenant_branchId = fields.Char(index='btree_not_null')
     delivery_radius_km = fields.Integer(default=1)
     notes = fields.Char()
+    ordertech_menu_sync_pending = fields.Boolean(copy=False, readonly=True)
+    ordertech_menu_sync_user_id = fields.Many2one('res.users', copy=False, readonly=True)
+    ordertech_menu_reconcile_pending = fields.Boolean(copy=False, readonly=True)
+    ordertech_menu_reconcile_attempts = fields.Integer(copy=False, readonly=True)
+    ordertech_menu_reconcile_user_id = fields.Many2one('res.users', copy=False, readonly=True)
 
     @api.onchange('parent_id')
     def check_branch(self):
@@ -70,17 +74,12 @@ class ResCompany(models.Model):
         return hours + (minutes / 60.0)
 
     def sync_ordertech_restaurant(self):
-        instance = self.env.ref('ordertech_integration.default_ordertech_instance')
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             raise UserError("OrderTech instance is missing.")
         for company in self:
-            url = f"{instance.url}/api/tenants/my-restaurants"
-            headers = {
-                'accept': '*/*',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
             try:
-                response = requests.request("GET", url, headers=headers)
+                response = instance._ordertech_request("GET", "/api/tenants/my-restaurants")
                 if response.status_code != 200:
                     _logger.warning("OrderTech API returned  %s for company %s", response.text, company.id)
                 response = response.json()
@@ -108,70 +107,70 @@ class ResCompany(models.Model):
     def write(self, vals):
         trigger_update_rest = bool(TENANT_TRACKED_FIELDS & vals.keys())
         trigger_update_branch = bool(TENANT_TRACKED_FIELDS & vals.keys())
+        self.env['ordertech.id.registry']._invalidate(self, vals)
         res = super(ResCompany, self).write(vals)
         if trigger_update_rest:
             companies = self.filtered(
                 lambda c: c.is_restaurant and c.ordertech_tenantId
             )
-            companies.update_tenant_api()
+            self.env['ordertech.sync.job']._enqueue(companies, 'update_tenant_api')
         if trigger_update_branch:
             branches = self.filtered(
                 lambda b: b.is_branch and b.parent_id.ordertech_tenantId and b.ordertech_tenant_branchId
             )
-            branches.update_tenant_branch_api()
+            self.env['ordertech.sync.job']._enqueue(branches, 'update_tenant_branch_api')
         return res
 
+    def unlink(self):
+        self.env['ordertech.id.registry']._invalidate(self)
+        return super(ResCompany, self).unlink()
+
     def update_tenant_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
+            return self
+        calls = []
         for company in self:
-            url = f"{instance.url}/api/tenants/{company.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
+            payload = {
                 'name': company.name,
                 'email': company.email,
                 'phone': company.phone,
                 'openingTime': company.float_to_time(company.opening_time),
                 'closingTime': company.float_to_time(company.closing_time),
-            })
+            }
+            calls.append((company, "PUT", f"/api/tenants/{company.ordertech_tenantId}", payload))
+        failed = self.browse()
+        for company, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= company
                     _logger.error(
                         "OrderTech tenant sync failed for company %s: %s",
                         company.id,response.text,
                     )
                 _logger.info("Successfully synced restaurant update data for company %s", company.id)
             except requests.exceptions.RequestException as e:
+                failed |= company
                 _logger.error(
                     "OrderTech API request error for company %s : %s",
                     company.id,
                     str(e),
                 )
-        return True
+        return failed
 
     def update_tenant_branch_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
+            return self
+        calls = []
         for branch in self:
-            url = f"{instance.url}/api/branches/{branch.ordertech_tenant_branchId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
             slugify = self.env['ir.http']._slugify
             slug = slugify(branch.name)
             timezone = self.env.context.get('tz')
-            payload = json.dumps({
+            payload = {
                 "name": branch.name,
                 "slug": slug,
                 "status": "open",
@@ -188,22 +187,27 @@ class ResCompany(models.Model):
                 "notes": branch.notes,
                 "openingTime": branch.float_to_time(branch.opening_time),
                 "closingTime": branch.float_to_time(branch.closing_time)
-            })
+            }
+            calls.append((branch, "PUT", f"/api/branches/{branch.ordertech_tenant_branchId}", payload))
+        failed = self.browse()
+        for branch, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= branch
                     _logger.error(
                         "OrderTech tenant sync failed for branch %s : %s",
                         branch.id,response.text,
                     )
                 _logger.info("Successfully synced branch update data for company %s", branch.id)
             except Exception as e:
+                failed |= branch
                 _logger.error(
                     "OrderTech API request error for branch %s: %s",
                     branch.id,
                     str(e),
                 )
-        return True
+        return failed
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -214,26 +218,21 @@ class ResCompany(models.Model):
             lambda c: c.is_branch and c.parent_id and c.parent_id.ordertech_tenantId
         )
         if branches:
-            branches.create_tenant_branch_api()
+            self.env['ordertech.sync.job']._enqueue(branches, 'create_tenant_branch_api')
         return companies
 
     def create_tenant_branch_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance missing, branch sync skipped.")
-            return False
+            return self
+        calls = []
         for branch in self:
-            url = f"{instance.url}/api/branches"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
             slugify = self.env['ir.http']._slugify
             slug = slugify(branch.name)
             tenantId = branch.parent_id.ordertech_tenantId
             timezone = self.env.context.get('tz')
-            payload = json.dumps({
+            payload = {
                 "name": branch.name,
                 "slug": slug,
                 "tenantId": tenantId,
@@ -251,10 +250,14 @@ class ResCompany(models.Model):
                 "notes": branch.notes,
                 "openingTime": branch.float_to_time(branch.opening_time),
                 "closingTime": branch.float_to_time(branch.closing_time)
-            })
+            }
+            calls.append((branch, "POST", "/api/branches", payload))
+        failed = self.browse()
+        for branch, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= branch
                     _logger.error(
                         "OrderTech tenant branch sync failed for branch %s: %s ",
                         branch.id,response.text,
@@ -267,17 +270,31 @@ class ResCompany(models.Model):
                 })
                 _logger.info("Successfully synced branch data for branch %s", branch.id)
             except Exception as e:
+                failed |= branch
                 _logger.error(
                     "OrderTech API request error for branch %s: %s",
                     branch.id,
                     str(e),
                 )
+        return failed
 
     def action_sync_branch_to_ordertech(self):
         branches = self.filtered(
             lambda c: c.is_branch and c.parent_id and c.parent_id.ordertech_tenantId and not c.ordertech_tenant_branchId
         )
         if branches:
-            branches.create_tenant_branch_api()
+            self.env['ordertech.sync.job']._run_now(branches, 'create_tenant_branch_api')
+
+        return True
+
+    def action_sync_menu_to_ordertech(self):
+        companies = self.filtered(lambda c: c.ordertech_tenantId)
+        return self.env['ordertech.menu.sync']._action_run(companies)
+
+    def action_preview_menu_reconciliation(self):
+        companies = self.filtered(lambda c: c.is_restaurant and c.ordertech_tenantId)
+        return self.env['ordertech.menu.reconcile']._action_run(companies, apply=False)
 
-        return True
\ No newline at end of file
+    def action_reconcile_menu_with_ordertech(self):
+        companies = self.filtered(lambda c: c.is_restaurant and c.ordertech_tenantId)
+        return self.env['ordertech.menu.reconcile']._action_run(companies)
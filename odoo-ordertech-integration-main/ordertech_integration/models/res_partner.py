@@ -1,8 +1,5 @@
-import json
 import logging
 
-import requests
-
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 from odoo.tools import email_normalize
@@ -17,9 +14,10 @@ CUSTOMER_TRACKED_FIELDS = {
 
 
 class ResPartner(models.Model):
-    _inherit = 'res.partner'
+    _name = 'res.partner'
+    _inherit = ['res.partner', 'ordertech.sync.mixin']
 
-    ordertech_customerId = fields.Char()
+    ordertech_customerId = fields.Char(index='btree_not_null')
     ordertech_tenantId = fields.Char(related='company_id.ordertech_tenantId')
     ordertech_tenant_branchId = fields.Char(related='company_id.ordertech_tenant_branchId')
 
@@ -49,29 +47,29 @@ class ResPartner(models.Model):
             )
         )
         if customers:
-            customers.create_tenant_customer_api()
+            self.env['ordertech.sync.job']._enqueue(customers, 'create_tenant_customer_api')
         return partners
 
     def create_tenant_customer_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance missing, customer sync skipped.")
-            return False
+            return self
+        calls = []
         for customer in self:
-            url = f"{instance.url}/api/customers/tenant/{customer.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
+            payload = {
                 "full_name": customer.name,
                 "phone_e164": customer.phone,
                 # "email": customer.email,
-            })
+            }
+            calls.append((customer, "POST", f"/api/customers/tenant/{customer.company_id.ordertech_tenantId}", payload))
+        payloads = {call[0]: call[3] for call in calls}
+        failed = self.browse()
+        for customer, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 201:
+                    failed |= customer
                     _logger.error(
                         "OrderTech tenant customer sync failed for customer %s: %s ",
                         customer.id, response.text,
@@ -81,16 +79,20 @@ class ResPartner(models.Model):
                 customer.sudo().write({
                     'ordertech_customerId': data['id'],
                 })
+                customer._ordertech_store_fingerprint(payloads[customer])
                 _logger.info("Successfully synced customer data for customer %s", customer.id)
             except Exception as e:
+                failed |= customer
                 _logger.error(
                     "OrderTech API request error for customer %s: %s",
                     customer.id,
                     str(e),
                 )
+        return failed
 
     def write(self, vals):
         trigger_update_cust = bool(CUSTOMER_TRACKED_FIELDS & vals.keys())
+        self.env['ordertech.id.registry']._invalidate(self, vals)
         res = super(ResPartner, self).write(vals)
         if trigger_update_cust:
             customers = self.filtered(
@@ -103,42 +105,49 @@ class ResPartner(models.Model):
                 )
             )
             if customers:
-                customers.update_tenant_customer_api()
+                self.env['ordertech.sync.job']._enqueue(customers, 'update_tenant_customer_api')
         return res
 
+    def unlink(self):
+        self.env['ordertech.id.registry']._invalidate(self)
+        return super(ResPartner, self).unlink()
+
     def update_tenant_customer_api(self):
-        instance = self.env.ref("ordertech_integration.default_ordertech_instance")
+        instance = self.env['ordertech.configration']._get_instance()
         if not instance or not instance.ordertech_token:
             _logger.error("OrderTech instance is missing.")
-            return False
+            return self
+        calls = []
         for customer in self:
-            url = f"{instance.url}/api/customers/{customer.ordertech_customerId}/tenant/{customer.company_id.ordertech_tenantId}"
-            headers = {
-                'accept': '*/*',
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {instance.ordertech_token}'
-            }
-            payload = json.dumps({
+            payload = {
                 "full_name": customer.name,
                 "phone_e164": customer.phone,
                 # "email": customer.email,
-            })
+            }
+            calls.append((customer, "PUT", f"/api/customers/{customer.ordertech_customerId}/tenant/{customer.company_id.ordertech_tenantId}", payload))
+        calls = self._ordertech_skip_unchanged(calls)
+        payloads = {call[0]: call[3] for call in calls}
+        failed = self.browse()
+        for customer, result in instance._ordertech_dispatch(calls):
             try:
-                response = requests.request("PUT", url, headers=headers, data=payload, timeout=10)
+                response = result()
                 if response.status_code != 200:
+                    failed |= customer
                     _logger.error(
                         "OrderTech tenant customer sync failed for customer %s: %s ",
                         customer.id, response.text,
                     )
                     continue
+                customer._ordertech_store_fingerprint(payloads[customer])
                 _logger.info("Successfully synced customer data update for customer %s", customer.id)
             except Exception as e:
+                failed |= customer
                 _logger.error(
                     "OrderTech API request error for customer %s: %s",
                     customer.id,
                     str(e),
                 )
-        return True
+        return failed
 
     def action_sync_customer_to_ordertech(self):
         customers = self.filtered(
@@ -151,7 +160,7 @@ class ResPartner(models.Model):
             )
         )
         if customers:
-            customers.create_tenant_customer_api()
+            self.env['ordertech.sync.job']._run_now(customers, 'create_tenant_customer_api')
 
         return True
 
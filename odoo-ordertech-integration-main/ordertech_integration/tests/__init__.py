@@ -0,0 +1,7 @@
+from . import test_benchmark_inbound
+from . import test_benchmark_sync
+from . import test_sync_watermark
+from . import test_http_client
+from . import test_sync_job
+from . import test_idempotency_key
+from . import test_menu_reconcile
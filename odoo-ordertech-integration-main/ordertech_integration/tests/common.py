@@ -0,0 +1,69 @@
+import logging
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_logger = logging.getLogger(__name__)
+
+_SQL_COUNT = re.compile(r'total;dur=[\d.]+;desc="(\d+) sql"')
+
+
+def bench_size(name, default):
+    """ Size of a benchmark, overridable with the ``ORDERTECH_BENCH_<NAME>``
+    environment variable. """
+    return int(os.environ.get(f'ORDERTECH_BENCH_{name.upper()}', default))
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def report(name, latencies, wall, queries=None, unit='req'):
+    """ Log and return the throughput and latency percentiles (ms) of a run. """
+    latencies = [latency * 1000 for latency in latencies]
+    stats = {
+        'count': len(latencies),
+        'throughput': len(latencies) / wall if wall else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'queries': statistics.mean(queries) if queries else None,
+    }
+    _logger.info(
+        "OrderTech benchmark %s: %s %ss in %.2fs, %.1f %s/s, p50 %.1f ms, p95 %.1f ms, p99 %.1f ms%s",
+        name, stats['count'], unit, wall, stats['throughput'], unit, stats['p50'], stats['p95'], stats['p99'],
+        f", {stats['queries']:.1f} queries/{unit}" if queries else "",
+    )
+    return stats
+
+
+def report_throughput(name, count, wall, unit='record'):
+    """ Log and return the throughput of a run processing ``count`` items. """
+    throughput = count / wall if wall else 0.0
+    _logger.info("OrderTech benchmark %s: %s %ss in %.2fs, %.1f %s/s", name, count, unit, wall, throughput, unit)
+    return throughput
+
+
+def run_concurrently(func, payloads, workers):
+    """ Call ``func(payload)`` for every payload from ``workers`` threads and
+    return ``(results, latencies, wall time)``. """
+    def timed(payload):
+        start = time.monotonic()
+        result = func(payload)
+        return result, time.monotonic() - start
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(timed, payloads))
+    wall = time.monotonic() - start
+    return [result for result, _latency in outcomes], [latency for _result, latency in outcomes], wall
+
+
+def sql_count(response):
+    """ Queries run by a request, from its ``Server-Timing`` header. """
+    match = _SQL_COUNT.search(response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
@@ -0,0 +1,165 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+
+class MockOrderTech:
+    """ Local stand-in for the OrderTech API, serving the endpoints the
+    connector calls on ``127.0.0.1`` from a background thread.
+
+    Every request waits ``latency`` seconds (plus up to ``jitter``), then
+    fails with a 503 with probability ``error_rate``, or is throttled with a
+    429 (``Retry-After: 0``) every ``throttle_every`` requests.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_every=0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_every = throttle_every
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.records = {}
+        self.server = None
+        self.thread = None
+        self.routes = [
+            ('GET', r'/api/tenants/my-restaurants', self._my_restaurants),
+            ('PUT', r'/api/tenants/(?P<id>[^/]+)', self._update),
+            ('POST', r'/api/branches', self._create_branch),
+            ('PUT', r'/api/branches/(?P<id>[^/]+)', self._update),
+            ('GET', r'/api/menu/(?P<kind>categories|addon-groups|addon-items|products)/(?P<tenant>[^/]+)', self._list),
+            ('DELETE', r'/api/menu/(?P<kind>categories|addon-groups|addon-items|products)/(?P<id>[^/]+)', self._delete),
+            ('POST', r'/api/menu/categories/(?P<tenant>[^/]+)', self._create),
+            ('PUT', r'/api/menu/categories/(?P<id>[^/]+)', self._update),
+            ('POST', r'/api/menu/addon-groups/(?P<tenant>[^/]+)', self._create),
+            ('PUT', r'/api/menu/addon-groups/(?P<id>[^/]+)', self._update),
+            ('POST', r'/api/menu/addon-items/(?P<tenant>[^/]+)', self._create_addon_item),
+            ('PUT', r'/api/menu/addon-items/(?P<id>[^/]+)', self._update),
+            ('POST', r'/api/menu/products/(?P<tenant>[^/]+)', self._create),
+            ('PUT', r'/api/menu/products/(?P<id>[^/]+)', self._update),
+            ('POST', r'/api/customers/tenant/(?P<tenant>[^/]+)', self._create),
+            ('PUT', r'/api/customers/(?P<id>[^/]+)/tenant/(?P<tenant>[^/]+)', self._update),
+            ('POST', r'/api/integrations/odoo/webhook/order-status', self._order_status),
+        ]
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'null') if length else None
+                status, payload, headers = mock._dispatch(self.command, self.path, body)
+                data = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='mock-ordertech', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _dispatch(self, method, path, body):
+        path, _sep, query = path.partition('?')
+        params = dict(param.partition('=')[::2] for param in query.split('&') if param)
+        with self.lock:
+            self.requests.append((method, path, body))
+            count = len(self.requests)
+            failing = self.random.random() < self.error_rate
+            delay = self.latency + self.random.random() * self.jitter
+        if delay:
+            time.sleep(delay)
+        if self.throttle_every and count % self.throttle_every == 0:
+            return 429, {'error': 'Too Many Requests'}, {'Retry-After': '0'}
+        if failing:
+            return 503, {'error': 'Service Unavailable'}, {}
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                if method == 'GET' and params:
+                    return handler(path, body, params=params, **match.groupdict())
+                return handler(path, body, **match.groupdict())
+        return 404, {'error': f'No route for {method} {path}'}, {}
+
+    def _store(self, body, **values):
+        record_id = str(uuid4())
+        with self.lock:
+            self.records[record_id] = dict(body or {}, **values)
+        return record_id
+
+    def _my_restaurants(self, path, body):
+        return 200, [{
+            'id': 'mock-tenant',
+            'name_display': 'Mock Restaurant',
+            'phone': '+201000000000',
+            'email': 'mock@example.com',
+            'opening_time': '09:00',
+            'closing_time': '23:00',
+        }], {}
+
+    def _create(self, path, body, tenant=None):
+        return 201, {'id': self._store(body, tenant=tenant, kind=path.split('/')[-2])}, {}
+
+    def _list(self, path, body, kind=None, tenant=None, params=None):
+        page, limit = int((params or {}).get('page', 1)), int((params or {}).get('limit', 100))
+        with self.lock:
+            items = [
+                dict(values, id=record_id) for record_id, values in self.records.items()
+                if values.get('kind') == kind and values.get('tenant') == tenant
+            ]
+        return 200, items[(page - 1) * limit:page * limit], {}
+
+    def _delete(self, path, body, kind=None, id=None):
+        with self.lock:
+            found = self.records.pop(id, None)
+        return (204, None, {}) if found else (404, {'error': 'Not Found'}, {})
+
+    def _create_branch(self, path, body):
+        tenant = (body or {}).get('tenantId') or 'mock-tenant'
+        return 201, {'id': self._store(body), 'tenantId': tenant}, {}
+
+    def _create_addon_item(self, path, body, tenant=None):
+        return 201, {'items': [{'id': self._store(body, tenant=tenant, kind='addon-items')}]}, {}
+
+    def _update(self, path, body, id=None, tenant=None):
+        with self.lock:
+            if id in self.records:
+                self.records[id].update(body or {})
+        return 200, {'id': id}, {}
+
+    def _order_status(self, path, body):
+        return 201, {'status': 'ok'}, {}
@@ -0,0 +1,120 @@
+import json
+import random
+
+from odoo.tests import tagged
+
+from odoo.addons.point_of_sale.tests.test_frontend import TestPointOfSaleHttpCommon
+from .common import bench_size, report, run_concurrently, sql_count
+
+
+@tagged('post_install', '-at_install', '-standard', 'ordertech_benchmark')
+class TestInboundBenchmark(TestPointOfSaleHttpCommon):
+    """ Load test of the inbound OrderTech API, run on demand with
+    ``--test-tags ordertech_benchmark``.
+
+    Requests are sent from several threads but share the test cursor, so
+    the server handles them one at a time: throughput is that of a single
+    worker, latencies include the wait for the cursor.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.products_count = bench_size('products', 50)
+        cls.customers_count = bench_size('customers', 100)
+        cls.orders_count = bench_size('orders', 200)
+        cls.workers = bench_size('workers', 4)
+
+        cls.instance = cls.env.ref('ordertech_integration.default_ordertech_instance')
+        cls.instance.api_key = 'ordertech-benchmark-key'
+        cls.branch = cls.main_pos_config.company_id
+        cls.branch.ordertech_tenant_branchId = 'bench-branch'
+
+        sizes = cls.env.ref('ordertech_integration.ordertech_product_sizes_attribute')
+        size_values = cls.env['product.attribute.value'].create([
+            {'attribute_id': sizes.id, 'name': name} for name in ('Small', 'Medium', 'Large')
+        ])
+        addons = cls.env['product.attribute'].create({
+            'name': 'Bench Add-ons',
+            'is_addons': True,
+            'display_type': 'multi',
+            'create_variant': 'no_variant',
+            'ordertech_addons_groupId': 'bench-group',
+        })
+        addon_values = cls.env['product.attribute.value'].create([
+            {'attribute_id': addons.id, 'name': f'Add-on {i}', 'default_extra_price': i,
+             'ordertech_addons_itemId': f'bench-item-{i}'}
+            for i in range(5)
+        ])
+        cls.env['product.template'].create([{
+            'name': f'Bench Product {i}',
+            'list_price': 10 + i,
+            'available_in_pos': True,
+            'ordertech_productId': f'bench-product-{i}',
+            'attribute_line_ids': [
+                (0, 0, {'attribute_id': sizes.id, 'value_ids': [(6, 0, size_values.ids)]}),
+                (0, 0, {'attribute_id': addons.id, 'value_ids': [(6, 0, addon_values.ids)]}),
+            ],
+        } for i in range(cls.products_count)])
+        cls.env['res.partner'].create([{
+            'name': f'Bench Customer {i}',
+            'phone': f'+2010{i:08d}',
+            'company_id': cls.branch.id,
+            'customer_rank': 1,
+            'ordertech_customerId': f'bench-customer-{i}',
+        } for i in range(cls.customers_count)])
+
+        cls.main_pos_config.open_ui()
+        cls.main_pos_config.current_session_id.set_opening_control(0, '')
+
+    def _post(self, route, payload):
+        return self.url_open(
+            f'{route}?debug=1',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json', 'X-API-KEY': self.instance.api_key},
+            timeout=60,
+        )
+
+    def _order_payload(self, index, rng):
+        return {
+            'ordertech_orderId': f'bench-order-{index}',
+            'company_id': 'bench-branch',
+            'customer_id': f'bench-customer-{rng.randrange(self.customers_count)}',
+            'lines': [{
+                'product_id': f'bench-product-{rng.randrange(self.products_count)}',
+                'qty': rng.randint(1, 3),
+                'size_value': rng.choice(['Small', 'Medium', 'Large']),
+                'attributes': [
+                    {'group_id': 'bench-group', 'item_id': f'bench-item-{item}'}
+                    for item in rng.sample(range(5), rng.randint(0, 2))
+                ],
+            } for _line in range(rng.randint(1, 4))],
+        }
+
+    def _run(self, name, route, payloads, expected_status):
+        responses, latencies, wall = run_concurrently(lambda p: self._post(route, p), payloads, self.workers)
+        for response in responses:
+            self.assertEqual(response.status_code, expected_status, response.text)
+        queries = [count for count in map(sql_count, responses) if count is not None]
+        return report(name, latencies, wall, queries)
+
+    def test_benchmark_orders(self):
+        rng = random.Random(42)
+        payloads = [self._order_payload(i, rng) for i in range(self.orders_count)]
+        self._run('POST /api/v1/order', '/api/v1/order', payloads, 201)
+        # replays are answered from the idempotency keys
+        self._run('POST /api/v1/order (replay)', '/api/v1/order', payloads, 201)
+        self.assertEqual(
+            self.env['pos.order'].search_count([('ordertech_orderId', '=like', 'bench-order-%')]),
+            self.orders_count,
+        )
+
+    def test_benchmark_customers(self):
+        payloads = [{
+            'ordertech_customerId': f'bench-new-customer-{i}',
+            'ordertech_tenant_branchId': 'bench-branch',
+            'name': f'Bench New Customer {i}',
+            'phone': f'+2011{i:08d}',
+        } for i in range(self.customers_count)]
+        self._run('POST /api/v1/customer', '/api/v1/customer', payloads, 201)
+        self._run('POST /api/v1/customer (existing)', '/api/v1/customer', payloads, 200)
@@ -0,0 +1,115 @@
+import time
+
+from odoo.tests import TransactionCase, tagged
+
+from .common import bench_size, report_throughput
+from .mock_ordertech import MockOrderTech
+
+
+@tagged('post_install', '-at_install', '-standard', 'ordertech_benchmark')
+class TestSyncBenchmark(TransactionCase):
+    """ Throughput of the outbound sync against a local mock of OrderTech,
+    run on demand with ``--test-tags ordertech_benchmark``.
+
+    Rate limits are disabled on the instance so that the figures are those
+    of the client itself; the mock answers after ``ORDERTECH_BENCH_LATENCY_MS``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.latency = bench_size('latency_ms', 20) / 1000
+        cls.menu_sizes = [bench_size('menu_small', 20), bench_size('menu_large', 200)]
+        cls.mock = MockOrderTech(latency=cls.latency, seed=42).start()
+        cls.addClassCleanup(cls.mock.stop)
+        cls.instance = cls.env.ref('ordertech_integration.default_ordertech_instance')
+        cls.instance.write({
+            'url': cls.mock.url,
+            'ordertech_token': 'mock-token',
+            'rate_limit': 0,
+            'tenant_rate_limit': 0,
+            'breaker_threshold': 0,
+        })
+        cls.tenant = cls.env['res.company'].create({
+            'name': 'Mock Restaurant',
+            'is_restaurant': True,
+            'ordertech_tenantId': 'mock-tenant',
+        })
+        cls.branch = cls.env['res.company'].create({
+            'name': 'Mock Branch',
+            'parent_id': cls.tenant.id,
+            'is_branch': True,
+            'ordertech_tenantId': 'mock-tenant',
+            'ordertech_tenant_branchId': 'mock-branch',
+        })
+
+    def _seed_menu(self, size, tag):
+        categories = self.env['pos.category'].create([
+            {'name': f'{tag} Category {i}', 'company_id': self.tenant.id} for i in range(size)
+        ])
+        groups = self.env['product.attribute'].create([{
+            'name': f'{tag} Add-ons {i}',
+            'company_id': self.tenant.id,
+            'is_addons': True,
+            'display_type': 'multi',
+            'create_variant': 'no_variant',
+        } for i in range(max(size // 10, 1))])
+        items = self.env['product.attribute.value'].create([
+            {'attribute_id': group.id, 'name': f'{tag} Item {i}', 'default_extra_price': i}
+            for group in groups for i in range(5)
+        ])
+        products = self.env['product.template'].create([{
+            'name': f'{tag} Product {i}',
+            'company_id': self.tenant.id,
+            'available_in_pos': True,
+            'pos_categ_ids': [(6, 0, categories[i % len(categories)].ids)],
+        } for i in range(size)])
+        customers = self.env['res.partner'].create([{
+            'name': f'{tag} Customer {i}',
+            'phone': f'+2012{i:08d}',
+            'company_id': self.branch.id,
+            'customer_rank': 1,
+        } for i in range(size)])
+        return categories, groups, items, products, customers
+
+    def _measure(self, name, records, method):
+        records.invalidate_recordset()
+        start = time.monotonic()
+        failed = getattr(records, method)()
+        wall = time.monotonic() - start
+        self.assertFalse(failed, f"{name}: {len(failed)} record(s) failed to sync")
+        return report_throughput(name, len(records), wall)
+
+    def test_benchmark_menu_sync(self):
+        for size in self.menu_sizes:
+            categories, groups, items, products, customers = self._seed_menu(size, f'Bench{size}')
+            self._measure(f'categories x{size}', categories, 'create_tenant_category_api')
+            self._measure(f'addon groups x{len(groups)}', groups, 'create_tenant_addons_group_api')
+            self._measure(f'addon items x{len(items)}', items, 'create_tenant_addon_item_api')
+            self._measure(f'products x{size}', products, 'create_tenant_product_api')
+            self._measure(f'customers x{size}', customers, 'create_tenant_customer_api')
+            products.write({'list_price': 42})
+            self._measure(f'product updates x{size}', products, 'update_tenant_product_api')
+            self.assertTrue(all(categories.mapped('ordertech_categId')))
+            self.assertTrue(all(products.mapped('ordertech_productId')))
+
+    def test_benchmark_error_injection(self):
+        categories = self._seed_menu(bench_size('menu_small', 20), 'Errors')[0]
+        self.mock.error_rate = 0.2
+        try:
+            failed = categories.create_tenant_category_api()
+        finally:
+            self.mock.error_rate = 0.0
+        # failures are returned to the caller, the rest is synced
+        self.assertEqual(categories - failed, categories.filtered('ordertech_categId'))
+        self.assertFalse(failed.filtered('ordertech_categId'))
+
+    def test_benchmark_throttling(self):
+        categories = self._seed_menu(bench_size('menu_small', 20), 'Throttled')[0]
+        sent_before = len(self.mock.requests)
+        self.mock.throttle_every = 4
+        try:
+            self._measure('categories (throttled)', categories, 'create_tenant_category_api')
+        finally:
+            self.mock.throttle_every = 0
+        self.assertGreater(len(self.mock.requests) - sent_before, len(categories), "throttled requests are sent again")
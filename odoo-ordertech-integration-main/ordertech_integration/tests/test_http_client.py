@@ -0,0 +1,140 @@
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..tools import http_client
+from ..tools.http_client import AdaptiveLimit, CircuitBreaker, CircuitOpen, TokenBucket, _retry_after
+
+
+class FakeClock:
+    """ Stand-in for the ``time`` module of the client, where sleeping only
+    moves the clock forward. """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@tagged('post_install', '-at_install')
+class TestHttpClient(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        patcher = patch.object(http_client, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_circuit_breaker_opens_after_threshold(self):
+        breaker = CircuitBreaker()
+        for _i in range(2):
+            breaker.before_call(reset_timeout=30)
+            breaker.after_call(False, threshold=3)
+        # a success resets the consecutive failures
+        breaker.after_call(True, threshold=3)
+        for _i in range(3):
+            breaker.before_call(reset_timeout=30)
+            breaker.after_call(False, threshold=3)
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call(reset_timeout=30)
+        self.assertEqual(breaker.retry_in(30), 30)
+        self.clock.now += 10
+        self.assertEqual(breaker.retry_in(30), 20)
+
+    def test_circuit_breaker_half_open_probe(self):
+        breaker = CircuitBreaker()
+        breaker.after_call(False, threshold=1)
+        self.clock.now += 30
+        self.assertEqual(breaker.retry_in(30), 0)
+        breaker.before_call(reset_timeout=30)
+        # only the probe goes through while it is in flight
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call(reset_timeout=30)
+        self.assertEqual(breaker.retry_in(30), 30)
+        # a failed probe reopens the circuit at once
+        breaker.after_call(False, threshold=5)
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call(reset_timeout=30)
+        self.clock.now += 30
+        breaker.before_call(reset_timeout=30)
+        breaker.after_call(True, threshold=5)
+        self.assertEqual(breaker.retry_in(30), 0)
+        breaker.before_call(reset_timeout=30)
+
+    def test_token_bucket_burst_then_rate(self):
+        bucket = TokenBucket()
+        for _i in range(5):
+            bucket.acquire(5)
+        self.assertFalse(self.clock.sleeps, "a burst of rate requests is not held back")
+        bucket.acquire(5)
+        self.assertAlmostEqual(sum(self.clock.sleeps), 0.2)
+
+    def test_token_bucket_pause(self):
+        bucket = TokenBucket()
+        bucket.pause(3)
+        bucket.pause(1)
+        # no rate limit, but the pause still applies
+        bucket.acquire(0)
+        self.assertEqual(self.clock.sleeps, [3])
+        bucket.acquire(0)
+        self.assertEqual(self.clock.sleeps, [3])
+
+    def test_adaptive_limit(self):
+        limit = AdaptiveLimit()
+        limit.acquire(8)
+        self.assertEqual((limit.limit, limit.in_flight), (8, 1))
+        limit.release(True, 8)
+        self.assertEqual((limit.limit, limit.in_flight), (4, 0))
+        limit.acquire(8)
+        limit.release(False, 8)
+        self.assertEqual(limit.limit, 4.25)
+        for _i in range(5):
+            limit.acquire(8)
+            limit.release(True, 8)
+        self.assertEqual(limit.limit, 1, "the limit never drops below one request")
+        # a lower maximum applies at once
+        limit.limit = 8
+        limit.acquire(2)
+        self.assertEqual(limit.limit, 2)
+        limit.release(False, 2)
+        self.assertEqual(limit.limit, 2)
+
+
+@tagged('post_install', '-at_install')
+class TestRetryAfter(BaseCase):
+
+    def _response(self, retry_after=None):
+        return SimpleNamespace(headers={'Retry-After': retry_after} if retry_after is not None else {})
+
+    def test_seconds(self):
+        self.assertEqual(_retry_after(self._response('3'), 0, 0.5), 3)
+        self.assertEqual(_retry_after(self._response('1.5'), 4, 0.5), 1.5)
+
+    def test_http_date(self):
+        delay = _retry_after(self._response(formatdate(time.time() + 30, usegmt=True)), 0, 0.5)
+        self.assertTrue(25 <= delay <= 30, delay)
+        self.assertEqual(_retry_after(self._response(formatdate(time.time() - 30, usegmt=True)), 0, 0.5), 0)
+
+    def test_backoff_without_header(self):
+        self.assertEqual(_retry_after(self._response(), 0, 0.5), 0.5)
+        self.assertEqual(_retry_after(self._response(), 3, 0.5), 4)
+        self.assertEqual(_retry_after(self._response('soon'), 1, 0.5), 1)
+
+    def test_capped(self):
+        self.assertEqual(_retry_after(self._response('3600'), 0, 0.5), http_client.MAX_RETRY_AFTER)
+        self.assertEqual(_retry_after(self._response(), 20, 0.5), http_client.MAX_RETRY_AFTER)
+        self.assertEqual(_retry_after(self._response('-5'), 0, 0.5), 0)
@@ -0,0 +1,34 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestIdempotencyKey(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.IdempotencyKey = self.env['ordertech.idempotency.key']
+
+    def test_claim_once(self):
+        claim, claimed = self.IdempotencyKey._claim('order-1')
+        self.assertTrue(claimed)
+        replay, claimed = self.IdempotencyKey._claim('order-1')
+        self.assertFalse(claimed)
+        self.assertEqual(replay, claim)
+        # another key is claimed independently
+        self.assertTrue(self.IdempotencyKey._claim('order-2')[1])
+
+    def test_in_progress_then_stored_result(self):
+        claim = self.IdempotencyKey._claim('order-1')[0]
+        self.assertEqual(claim._stored_result()['status'], 409)
+        result = {'message': "order created successfully", 'data': {'order_id': 42}, 'status': 201}
+        claim._store(result)
+        replay, claimed = self.IdempotencyKey._claim('order-1')
+        self.assertFalse(claimed)
+        self.assertEqual(replay._stored_result(), result)
+        self.assertEqual(replay.status_code, 201)
+
+    def test_released_claim(self):
+        claim = self.IdempotencyKey._claim('order-1')[0]
+        # errors are not stored: the key is released for a retry
+        claim.unlink()
+        self.assertTrue(self.IdempotencyKey._claim('order-1')[1])
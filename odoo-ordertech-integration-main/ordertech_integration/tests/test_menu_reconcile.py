@@ -0,0 +1,113 @@
+from odoo.tests import TransactionCase, tagged
+
+from .mock_ordertech import MockOrderTech
+
+TENANT = 'reconcile-tenant'
+
+
+@tagged('post_install', '-at_install')
+class TestMenuReconcile(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mock = MockOrderTech(latency=0, seed=42).start()
+        cls.addClassCleanup(cls.mock.stop)
+        cls.env.ref('ordertech_integration.default_ordertech_instance').write({
+            'url': cls.mock.url,
+            'ordertech_token': 'mock-token',
+            'rate_limit': 0,
+            'tenant_rate_limit': 0,
+            'breaker_threshold': 0,
+        })
+        cls.tenant = cls.env['res.company'].create({
+            'name': 'Reconcile Restaurant',
+            'is_restaurant': True,
+            'ordertech_tenantId': TENANT,
+        })
+        cls.Reconcile = cls.env['ordertech.menu.reconcile']
+
+    def setUp(self):
+        super().setUp()
+        self.mock.records.clear()
+
+    def _categories(self, *names):
+        return self.env['pos.category'].create([{'name': name, 'company_id': self.tenant.id} for name in names])
+
+    def _remote(self, record, remote_id, **values):
+        """ Remote item of ``record``'s current payload, overridden by ``values``. """
+        return dict(record._prepare_ordertech_payloads()[record], id=remote_id, **values)
+
+    def _seed(self, kind, *items):
+        for item in items:
+            self.mock.records[item['id']] = dict(item, tenant=TENANT, kind=kind)
+
+    def test_diff(self):
+        synced, changed, unlinked, stale = self._categories('Starters', 'Mains', 'Desserts', 'Drinks')
+        synced.ordertech_categId = 'r-synced'
+        changed.ordertech_categId = 'r-changed'
+        stale.ordertech_categId = 'r-deleted-remotely'
+        remote_items = [
+            self._remote(synced, 'r-synced'),
+            self._remote(changed, 'r-changed', name_ar='Old Name'),
+            self._remote(unlinked, 'r-unlinked'),
+            {'id': 'r-orphan', 'slug': 'sides', 'name_en': 'Sides'},
+        ]
+        categories = synced | changed | unlinked | stale
+        diff = self.Reconcile._diff('categories', categories, 'ordertech_categId', remote_items)
+        self.assertEqual(diff['relink'], {unlinked: 'r-unlinked'})
+        self.assertEqual(diff['create'], stale)
+        self.assertEqual(diff['update'], changed)
+        self.assertEqual(diff['delete'], ['r-orphan'])
+
+    def test_diff_matches_ids_before_keys(self):
+        # the record holding the id comes after one sharing its slug
+        unlinked, linked, duplicate = self._categories('Drinks', 'Beverages', 'Juices')
+        linked.ordertech_categId = 'r-drinks'
+        duplicate.ordertech_categId = 'r-drinks'
+        remote_items = [self._remote(unlinked, 'r-drinks')]
+        categories = unlinked | linked | duplicate
+        diff = self.Reconcile._diff('categories', categories, 'ordertech_categId', remote_items)
+        self.assertFalse(diff['relink'], "a remote item is linked to a single record")
+        self.assertEqual(diff['create'], unlinked | duplicate)
+        self.assertEqual(diff['update'], linked)
+        self.assertEqual(diff['delete'], [])
+
+    def test_product_without_synced_category(self):
+        category = self._categories('Not Synced')
+        product = self.env['product.template'].create({
+            'name': 'Orphan Product',
+            'company_id': self.tenant.id,
+            'available_in_pos': True,
+            'pos_categ_ids': [(6, 0, category.ids)],
+        })
+        self.assertIsNone(product._prepare_ordertech_payloads()[product]['category_id'])
+        diff = self.Reconcile._diff('products', product, 'ordertech_productId', [])
+        self.assertEqual(diff['create'], product)
+        # the categories are previewed, the product waits for one of them
+        stats = {s['entity']: s for s in self.Reconcile._reconcile(self.tenant, apply=False)}
+        self.assertEqual(stats['categories']['create'], 1)
+        self.assertEqual(stats['products']['create'], 0)
+        self.assertFalse(self.mock.records, "a preview changes nothing")
+
+    def test_reconcile(self):
+        existing, unlinked, missing = self._categories('Starters', 'Mains', 'Desserts')
+        existing.ordertech_categId = 'r-existing'
+        self._seed(
+            'categories',
+            self._remote(existing, 'r-existing', name_en='Old Starters'),
+            self._remote(unlinked, 'r-unlinked'),
+            {'id': 'r-orphan', 'slug': 'sides', 'name_en': 'Sides'},
+        )
+        stats = {s['entity']: s for s in self.Reconcile._reconcile(self.tenant)}
+        self.assertEqual(
+            {key: stats['categories'][key] for key in ('relink', 'create', 'update', 'delete', 'failed')},
+            {'relink': 1, 'create': 1, 'update': 1, 'delete': 1, 'failed': 0},
+        )
+        self.assertEqual(unlinked.ordertech_categId, 'r-unlinked')
+        self.assertIn(missing.ordertech_categId, self.mock.records)
+        self.assertEqual(self.mock.records['r-existing']['name_en'], 'Starters')
+        self.assertNotIn('r-orphan', self.mock.records)
+        # a second run finds nothing left to do
+        stats = {s['entity']: s for s in self.Reconcile._reconcile(self.tenant, apply=False)}
+        self.assertFalse(any(stats['categories'][key] for key in ('relink', 'create', 'update', 'delete')))
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSyncJobCoalescing(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.SyncJob = cls.env['ordertech.sync.job']
+        cls.categories = cls.env['pos.category'].create([{'name': 'Coalesced 1'}, {'name': 'Coalesced 2'}])
+
+    def _commit(self):
+        """ Run the pre-commit hooks, where the queue is written. """
+        self.env.cr.precommit.run()
+
+    def _jobs(self, records):
+        return self.SyncJob.search([('res_model', '=', records._name), ('res_id', 'in', records.ids)])
+
+    def test_one_job_per_record_and_method(self):
+        for _i in range(3):
+            self.SyncJob._enqueue(self.categories, 'update_tenant_categId_api')
+        self.SyncJob._enqueue(self.categories[0], 'update_tenant_categId_api', delay=60)
+        self.assertFalse(self._jobs(self.categories), "nothing is written before commit")
+        self._commit()
+        jobs = self._jobs(self.categories)
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(set(jobs.mapped('method')), {'update_tenant_categId_api'})
+
+    def test_update_superseded_by_creation(self):
+        self.SyncJob._enqueue(self.categories, 'update_tenant_categId_api')
+        self.SyncJob._enqueue(self.categories[0], 'create_tenant_category_api')
+        self._commit()
+        jobs = self._jobs(self.categories)
+        self.assertEqual(
+            sorted((job.res_id, job.method) for job in jobs),
+            sorted([
+                (self.categories[0].id, 'create_tenant_category_api'),
+                (self.categories[1].id, 'update_tenant_categId_api'),
+            ]),
+        )
+
+    def test_pending_job_not_duplicated(self):
+        self.SyncJob._enqueue(self.categories[0], 'create_tenant_category_api')
+        self._commit()
+        # a later transaction queuing the creation again, or an update
+        self.SyncJob._enqueue(self.categories[0], 'create_tenant_category_api')
+        self.SyncJob._enqueue(self.categories[0], 'update_tenant_categId_api')
+        self._commit()
+        self.assertEqual(len(self._jobs(self.categories[0])), 1)
+        # a done job does not prevent queuing again
+        self._jobs(self.categories[0]).state = 'done'
+        self.SyncJob._enqueue(self.categories[0], 'update_tenant_categId_api')
+        self._commit()
+        self.assertEqual(len(self._jobs(self.categories[0]).filtered(lambda j: j.state == 'pending')), 1)
+
+    def test_creation_of_record_created_meanwhile_updates_it(self):
+        self.SyncJob._enqueue(self.categories, 'create_tenant_category_api')
+        self.SyncJob._enqueue(self.categories, 'update_tenant_categId_api')
+        self._commit()
+        jobs = self._jobs(self.categories)
+        self.assertEqual(jobs.mapped('method'), ['create_tenant_category_api'] * 2)
+        # e.g. created by the onboarding while the job waited for a retry
+        self.categories[0].ordertech_categId = 'remote-categ'
+        calls = []
+
+        def recorded(method):
+            def call(records):
+                calls.append((method, records))
+                return records.browse()
+            return call
+
+        PosCategory = type(self.env['pos.category'])
+        with patch.object(PosCategory, 'create_tenant_category_api', recorded('create')), \
+                patch.object(PosCategory, 'update_tenant_categId_api', recorded('update')):
+            jobs._run()
+        self.assertEqual(calls, [('create', self.categories[1]), ('update', self.categories[0])])
+        self.assertEqual(set(jobs.mapped('state')), {'done'})
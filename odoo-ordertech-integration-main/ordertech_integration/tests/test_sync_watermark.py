@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from .mock_ordertech import MockOrderTech
+
+
+@tagged('post_install', '-at_install')
+class TestSyncWatermark(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mock = MockOrderTech(latency=0, seed=42).start()
+        cls.addClassCleanup(cls.mock.stop)
+        cls.env.ref('ordertech_integration.default_ordertech_instance').write({
+            'url': cls.mock.url,
+            'ordertech_token': 'mock-token',
+            'rate_limit': 0,
+            'tenant_rate_limit': 0,
+            'breaker_threshold': 0,
+        })
+        cls.tenant = cls.env['res.company'].create({
+            'name': 'Watermark Restaurant',
+            'is_restaurant': True,
+            'ordertech_tenantId': 'watermark-tenant',
+        })
+        cls.Watermark = cls.env['ordertech.sync.watermark']
+        cls.entities = [
+            entity for entity in cls.Watermark._get_entities() if entity[0] == 'pos.category'
+        ]
+
+    def _create_categories(self, count, write_date):
+        categories = self.env['pos.category'].create([
+            {'name': f'Watermark Category {i}', 'company_id': self.tenant.id} for i in range(count)
+        ])
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE pos_category SET write_date = %s WHERE id IN %s", [write_date, tuple(categories.ids)],
+        )
+        categories.invalidate_recordset(['write_date'])
+        return categories
+
+    def _sync_deltas(self, chunk_size):
+        with patch.object(type(self.Watermark), '_get_entities', return_value=self.entities):
+            self.Watermark._cron_sync_deltas(chunk_size=chunk_size)
+
+    def test_full_chunk_then_next_run(self):
+        write_date = fields.Datetime.now() - timedelta(hours=1)
+        categories = self._create_categories(3, write_date)
+
+        self._sync_deltas(chunk_size=2)
+        watermark = self.Watermark._get('pos.category', 'watermark-tenant')
+        # the position of the chunk, not the write_date set by the sync itself
+        self.assertEqual(watermark.last_write_date, write_date)
+        self.assertEqual(watermark.last_id, categories[1].id)
+        self.assertTrue(all(categories[:2].mapped('ordertech_categId')))
+        self.assertFalse(categories[2].ordertech_categId)
+
+        self._sync_deltas(chunk_size=2)
+        self.assertTrue(categories[2].ordertech_categId)
+        self.assertEqual(watermark.last_id, categories[2].id)
@@ -0,0 +1,3 @@
+from . import metrics
+from . import tracing
+from . import http_client
@@ -0,0 +1,277 @@
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+from . import tracing
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+RETRY_STATUSES = (502, 503, 504)
+TOO_MANY_REQUESTS = 429
+MAX_RETRY_AFTER = 120
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_states = {}
+_states_lock = threading.Lock()
+
+OUTBOUND_REQUESTS = metrics.counter(
+    'ordertech_outbound_requests_total', "Requests sent to OrderTech, by endpoint, entity and status.")
+OUTBOUND_LATENCY = metrics.histogram(
+    'ordertech_outbound_request_seconds', "Latency of the requests sent to OrderTech.")
+OUTBOUND_RETRIES = metrics.counter(
+    'ordertech_outbound_retries_total', "Requests sent to OrderTech again after a 429 response.")
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """ OrderTech is considered down: the request was not sent. """
+
+
+class CircuitBreaker:
+    """ Consecutive failure counter of a connector in the current process.
+
+    After ``threshold`` consecutive failures (errors, 5xx responses or calls
+    slower than ``slow_call``) the circuit opens and requests fail at once
+    with ``CircuitOpen``. Once ``reset_timeout`` has elapsed a single probe
+    request is let through (half-open): it closes the circuit when it
+    succeeds and reopens it otherwise.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def retry_in(self, reset_timeout):
+        """ Seconds until a request may be sent again, 0 when closed. """
+        if self.opened_at is None:
+            return 0
+        remaining = self.opened_at + reset_timeout - time.monotonic()
+        if remaining > 0:
+            return remaining
+        # half-open: only the probe in flight may go through
+        return reset_timeout if self.probing else 0
+
+    def before_call(self, reset_timeout):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < reset_timeout:
+                raise CircuitOpen("OrderTech is unavailable, request not sent (circuit open)")
+            self.probing = True
+
+    def after_call(self, success, threshold):
+        with self.lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.probing or self.failures >= threshold:
+                    self.opened_at = time.monotonic()
+            self.probing = False
+
+
+def _build_session(pool_size, max_retries, backoff):
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(params):
+    """ Return the keep-alive session of the current worker process for the
+    connector described by ``params``, building it on first use. """
+    key = (os.getpid(), params['key'])
+    options = (params['pool_size'], params['max_retries'], params['retry_backoff'])
+    entry = _sessions.get(key)
+    if entry is None or entry[0] != options:
+        with _sessions_lock:
+            entry = _sessions.get(key)
+            if entry is None or entry[0] != options:
+                if entry is not None:
+                    entry[1].close()
+                entry = _sessions[key] = (options, _build_session(*options))
+    return entry[1]
+
+
+class TokenBucket:
+    """ Rate limiter letting ``rate`` requests per second through on
+    average, with bursts of up to ``rate`` requests. ``pause`` holds every
+    request back, e.g. for the ``Retry-After`` of a 429 response. """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = None
+        self.updated = 0.0
+        self.paused_until = 0.0
+
+    def acquire(self, rate):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif not rate:
+                    return
+                else:
+                    burst = max(rate, 1)
+                    tokens = burst if self.tokens is None else min(burst, self.tokens + (now - self.updated) * rate)
+                    self.updated = now
+                    if tokens >= 1:
+                        self.tokens = tokens - 1
+                        return
+                    self.tokens = tokens
+                    wait = (1 - tokens) / rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveLimit:
+    """ Concurrency limit tuned by additive increase / multiplicative
+    decrease: each uncongested response raises the limit by about one request
+    per round-trip up to ``maximum``, a 429 or a slow response halves it. """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.limit = None
+
+    def acquire(self, maximum):
+        with self.condition:
+            self.limit = min(self.limit or maximum, maximum)
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, congested, maximum):
+        with self.condition:
+            self.in_flight -= 1
+            if congested:
+                self.limit = max(self.limit / 2, 1.0)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, maximum)
+            self.condition.notify_all()
+
+
+def _get_state(cls, key):
+    """ Return the ``cls`` instance of the current process for ``key``. """
+    state = _states.get((cls, key))
+    if state is None:
+        with _states_lock:
+            state = _states.setdefault((cls, key), cls())
+    return state
+
+
+def get_breaker(params):
+    return _get_state(CircuitBreaker, params['key'])
+
+
+def _retry_after(response, attempt, backoff):
+    """ Seconds to wait before retrying a 429 ``response``. """
+    value = response.headers.get('Retry-After')
+    delay = None
+    if value:
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+    if delay is None:
+        delay = backoff * 2 ** attempt
+    return min(max(delay, 0), MAX_RETRY_AFTER)
+
+
+def retry_in(params):
+    """ Seconds before the connector's circuit lets requests through again,
+    0 when it is closed (or the breaker disabled). """
+    if not params['breaker_threshold']:
+        return 0
+    return get_breaker(params).retry_in(params['breaker_reset_timeout'])
+
+
+def send(params, method, endpoint, payload=None, tenant=None, entity=None):
+    """ Perform a request against OrderTech.
+
+    ``params`` is a plain dict (see ``ordertech.configration._get_client_params``)
+    so this function never touches the ORM and can safely run in any thread.
+    Raises ``CircuitOpen`` without sending while OrderTech is considered down.
+
+    Requests go through the connector's token bucket, and the one of
+    ``tenant`` when given, and its adaptive concurrency limit. A 429 response
+    pauses the buckets for its ``Retry-After`` and the request is sent again,
+    up to ``max_retries`` times. ``entity`` (model name) labels its metrics.
+    """
+    labels = {'method': method, 'endpoint': metrics.endpoint_template(endpoint), 'entity': entity or ''}
+    breaker = get_breaker(params) if params['breaker_threshold'] else None
+    if breaker:
+        try:
+            breaker.before_call(params['breaker_reset_timeout'])
+        except CircuitOpen:
+            OUTBOUND_REQUESTS.inc(dict(labels, status='circuit_open'))
+            raise
+    headers = {
+        'accept': '*/*',
+        'Authorization': f"Bearer {params['token']}",
+    }
+    buckets = [(_get_state(TokenBucket, params['key']), params['rate_limit'])]
+    if tenant:
+        buckets.append((_get_state(TokenBucket, (params['key'], tenant)), params['tenant_rate_limit']))
+    limit = _get_state(AdaptiveLimit, params['key'])
+    attempt = 0
+    while True:
+        for bucket, rate in buckets:
+            bucket.acquire(rate)
+        limit.acquire(params['max_workers'])
+        start = time.monotonic()
+        try:
+            with tracing.span(f"{method} {labels['endpoint']}", sql=False):
+                response = get_session(params).request(
+                    method,
+                    f"{params['url']}{endpoint}",
+                    headers=headers,
+                    json=payload,
+                    timeout=params['timeout'],
+                )
+        except requests.exceptions.RequestException:
+            OUTBOUND_REQUESTS.inc(dict(labels, status='error'))
+            OUTBOUND_LATENCY.observe(time.monotonic() - start, labels)
+            limit.release(True, params['max_workers'])
+            if breaker:
+                breaker.after_call(False, params['breaker_threshold'])
+            raise
+        elapsed = time.monotonic() - start
+        OUTBOUND_REQUESTS.inc(dict(labels, status=response.status_code))
+        OUTBOUND_LATENCY.observe(elapsed, labels)
+        slow = params['slow_call'] and elapsed > params['slow_call']
+        throttled = response.status_code == TOO_MANY_REQUESTS
+        limit.release(throttled or slow, params['max_workers'])
+        if throttled and attempt < params['max_retries']:
+            delay = _retry_after(response, attempt, params['retry_backoff'])
+            for bucket, _rate in buckets:
+                bucket.pause(delay)
+            OUTBOUND_RETRIES.inc({'endpoint': labels['endpoint']})
+            attempt += 1
+            continue
+        if breaker:
+            breaker.after_call(response.status_code < 500 and not slow, params['breaker_threshold'])
+        return response
@@ -0,0 +1,304 @@
+import atexit
+import json
+import os
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from odoo.tools import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# seconds between two writes of the metrics of a process to its file
+FLUSH_INTERVAL = 5.0
+ARCHIVE_SUFFIX = '.archive.json'
+
+_lock = threading.Lock()
+_metrics = {}
+_process = {'pid': None, 'path': None, 'flushed': 0.0, 'timer': None}
+
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F-]{8,})$')
+_PROCESS_FILE = re.compile(r'^(?P<node>[\w.]+)-(?P<pid>\d+)-\d+\.json$')
+
+
+def _labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in key
+    )
+    return '{%s}' % ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+
+    def inc(self, labels=None, value=1):
+        key = _labels_key(labels)
+        with _lock:
+            _check_process()
+            self.values[key] = self.values.get(key, 0) + value
+        _changed()
+
+    @staticmethod
+    def dump(value):
+        return value
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def samples(self, values):
+        for key, value in values.items():
+            yield self.name, key, value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, value, labels=None):
+        key = _labels_key(labels)
+        with _lock:
+            _check_process()
+            counts, total = self.values.setdefault(key, ([0] * len(self.buckets), [0.0, 0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            total[0] += value
+            total[1] += 1
+        _changed()
+
+    @contextmanager
+    def time(self, labels=None):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, labels)
+
+    @staticmethod
+    def dump(value):
+        counts, (total, count) = value
+        return [list(counts), total, count]
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def samples(self, values):
+        for key, (counts, total, count) in values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket', key + (('le', repr(float(bound))),), bucket_count
+            yield f'{self.name}_bucket', key + (('le', '+Inf'),), count
+            yield f'{self.name}_sum', key, total
+            yield f'{self.name}_count', key, count
+
+
+def _register(cls, name, *args):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _lock:
+            metric = _metrics.setdefault(name, cls(name, *args))
+    return metric
+
+
+def counter(name, documentation):
+    return _register(Counter, name, documentation)
+
+
+def histogram(name, documentation, buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, buckets)
+
+
+def endpoint_template(endpoint):
+    """ ``endpoint`` with its OrderTech ids replaced, as a metric label. """
+    path = endpoint.split('?', 1)[0]
+    return '/'.join(':id' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def _directory():
+    return os.path.join(config['data_dir'], 'ordertech_metrics')
+
+
+def _node_id():
+    """ Host and boot of the current process: the data directory may be
+    shared by several hosts, whose processes cannot be checked from here. """
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            boot_id = f.read().strip()
+    except OSError:
+        boot_id = ''
+    return re.sub(r'[^\w.]', '_', f'{socket.gethostname()}.{boot_id[:8]}')
+
+
+_NODE = _node_id()
+
+
+def _check_process():
+    """ Start the values of a forked worker from zero, in a file of its own;
+    called with the lock held. """
+    if _process['pid'] == os.getpid():
+        return
+    for metric in _metrics.values():
+        metric.values.clear()
+    _process.update(
+        pid=os.getpid(),
+        path=os.path.join(_directory(), f'{_NODE}-{os.getpid()}-{time.time_ns()}.json'),
+        flushed=0.0,
+        timer=None,
+    )
+
+
+def _changed():
+    """ Write the values of the process at most every ``FLUSH_INTERVAL``,
+    the last changes being written by a timer. """
+    if time.monotonic() - _process['flushed'] >= FLUSH_INTERVAL:
+        flush()
+    elif _process['timer'] is None:
+        with _lock:
+            if _process['timer'] is None:
+                _process['timer'] = timer = threading.Timer(FLUSH_INTERVAL, flush)
+                timer.daemon = True
+                timer.start()
+
+
+def _write(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def flush():
+    """ Write the values of the current process to its file. """
+    with _lock:
+        _check_process()
+        _process['flushed'] = time.monotonic()
+        _process['timer'] = None
+        data = {
+            metric.name: [[key, metric.dump(value)] for key, value in metric.values.items()]
+            for metric in _metrics.values() if metric.values
+        }
+        os.makedirs(os.path.dirname(_process['path']), exist_ok=True)
+        _write(_process['path'], data)
+
+
+@atexit.register
+def _flush_at_exit():
+    if _process['pid'] == os.getpid():
+        flush()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _merge(merged, data):
+    for name, values in data.items():
+        metric = _metrics.get(name)
+        if metric is None:
+            continue
+        totals = merged.setdefault(name, {})
+        for key, value in values:
+            key = tuple(tuple(label) for label in key)
+            totals[key] = metric.merge(totals.get(key), value)
+
+
+def collect():
+    """ Return the values of every worker process, summed per metric and
+    labels, as ``{name: {labels key: value}}``.
+
+    Each process writes its values to a file of its own, named after its
+    host. The files of the processes of this host that exited are folded
+    into the host's archive, so that counters keep growing across worker
+    restarts; the files of other hosts are only read.
+    """
+    flush()
+    directory = _directory()
+    archive_name = f'{_NODE}{ARCHIVE_SUFFIX}'
+    merged = {}
+    with open(os.path.join(directory, f'.{_NODE}.lock'), 'a') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = {}
+        _merge(archive, _load(os.path.join(directory, archive_name)))
+        exited = []
+        for filename in os.listdir(directory):
+            match = _PROCESS_FILE.match(filename)
+            if not match:
+                continue
+            path = os.path.join(directory, filename)
+            if match['node'] == _NODE and path != _process['path'] and not _alive(int(match['pid'])):
+                _merge(archive, _load(path))
+                exited.append(path)
+            else:
+                _merge(merged, _load(path))
+        archived = {name: [[key, value] for key, value in values.items()] for name, values in archive.items()}
+        if exited:
+            _write(os.path.join(directory, archive_name), archived)
+            for path in exited:
+                os.unlink(path)
+    for filename in os.listdir(directory):
+        if filename == archive_name:
+            _merge(merged, archived)
+        elif filename.endswith(ARCHIVE_SUFFIX):
+            _merge(merged, _load(os.path.join(directory, filename)))
+    return merged
+
+
+def render(gauges=()):
+    """ Return the metrics of all the worker processes in the Prometheus
+    text exposition format, followed by ``gauges``, a list of
+    ``(name, documentation, [(labels, value)])`` computed by the caller.
+    """
+    merged = collect()
+    lines = []
+    for metric in list(_metrics.values()):
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, key, value in metric.samples(merged.get(metric.name, {})):
+            lines.append(f'{name}{_format_labels(key)} {value}')
+    for name, documentation, samples in gauges:
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in samples:
+            lines.append(f'{name}{_format_labels(_labels_key(labels))} {value}')
+    return '\n'.join(lines) + '\n'
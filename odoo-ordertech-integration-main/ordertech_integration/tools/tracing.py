@@ -0,0 +1,85 @@
+import contextvars
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('ordertech_trace', default=None)
+_depth = contextvars.ContextVar('ordertech_trace_depth', default=0)
+
+_NON_TOKEN = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]+")
+
+
+class Trace:
+    """ Timing spans recorded while handling one request. SQL queries are
+    counted on ``cr`` for the spans run in the request's thread. """
+
+    def __init__(self, name, cr=None):
+        self.name = name
+        self.cr = cr
+        self.spans = []
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.sql_start = self.sql_count()
+        self.duration = None
+        self.queries = None
+
+    def sql_count(self):
+        return getattr(self.cr, 'sql_log_count', 0)
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def finish(self):
+        self.duration = (time.monotonic() - self.start) * 1000
+        self.queries = self.sql_count() - self.sql_start
+
+    def server_timing(self):
+        """ The spans as a ``Server-Timing`` header value. """
+        entries = [f'total;dur={self.duration:.1f};desc="{self.queries} sql"']
+        for span in sorted(self.spans, key=lambda s: s['start']):
+            desc = f';desc="{span["sql"]} sql"' if span['sql'] is not None else ''
+            entries.append(f'{_NON_TOKEN.sub("_", span["name"])};dur={span["duration"]:.1f}{desc}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def trace(name, cr=None, enabled=True):
+    """ Record the spans run in this context into a new ``Trace``, yielded
+    (``None`` when not ``enabled``, spans are then no-ops). """
+    if not enabled:
+        yield None
+        return
+    current = Trace(name, cr)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current.reset(token)
+
+
+@contextmanager
+def span(name, sql=True):
+    """ Time the enclosed block as a span of the current trace, with the
+    number of queries it ran unless ``sql`` is false (other threads). """
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.monotonic()
+    sql_start = current.sql_count() if sql else None
+    try:
+        yield
+    finally:
+        _depth.reset(token)
+        current.add({
+            'name': name,
+            'depth': depth,
+            'start': (start - current.start) * 1000,
+            'duration': (time.monotonic() - start) * 1000,
+            'sql': current.sql_count() - sql_start if sql else None,
+        })